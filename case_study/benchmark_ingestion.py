@@ -0,0 +1,91 @@
+"""
+
+Ingestion benchmark: OWL to Knowledge Graph
+
+Build synthetic ontologies of increasing size and time `KnowledgeGraph(onto)`
+with each ingestion engine ("owlready2" and "quadstore").
+Load time should scale linearly with the number of individuals, i.e. the time
+per individual (last column) should remain roughly constant.
+
+Usage:
+    python benchmark_ingestion.py [n_individuals ...]
+    e.g. python benchmark_ingestion.py 1000 10000 100000 1000000
+
+"""
+
+### Local
+from wonka.utils import *
+from wonka.representation import KnowledgeGraph
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+
+def synthetic_ontology(n_individuals: int, world: World = None) -> Ontology:
+    """Generate a saref-like ontology with `n_individuals` individuals:
+    devices (chained by `consistsOf` and its inverse) each having one property (with a value)
+    """
+    world = World() if world is None else world
+    onto = world.get_ontology("http://localhost/bench#")
+    with onto:
+
+        class Device(Thing):
+            pass
+
+        class Property(Thing):
+            pass
+
+        class consistsOf(Device >> Device):
+            pass
+
+        class isPartOf(Device >> Device):
+            inverse_property = consistsOf
+
+        class hasProperty(Device >> Property):
+            pass
+
+        class hasValue(Property >> float):
+            pass
+
+        n_devices = n_individuals // 2
+        devices = []
+        for i in range(n_devices):
+            device = Device(f"device_{i}")
+            prop = Property(f"property_{i}")
+            prop.hasValue = [float(i)]
+            device.hasProperty = [prop]
+            if i > 0:
+                # tree-shaped plant: each device is part of an earlier one
+                devices[(i - 1) // 4].consistsOf.append(device)
+            devices.append(device)
+    return onto
+
+
+def benchmark(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    engines: Sequence[str] = ("owlready2", "quadstore"),
+) -> pd.DataFrame:
+    records = []
+    for n in sizes:
+        onto = synthetic_ontology(n)
+        for engine in engines:
+            t0 = time.perf_counter()
+            KG = KnowledgeGraph(onto, engine=engine)
+            elapsed = time.perf_counter() - t0
+            records.append(
+                {
+                    "engine": engine,
+                    "individuals": n,
+                    "nodes": KG.number_of_nodes(),
+                    "edges": KG.number_of_edges(),
+                    "load time (s)": elapsed,
+                    "time per individual (us)": 1e6 * elapsed / n,
+                }
+            )
+        onto.world.close()
+    return pd.DataFrame(records)
+
+
+if __name__ == "__main__":
+    sizes = [int(n) for n in sys.argv[1:]] or DEFAULT_SIZES
+    df_benchmark = benchmark(sizes)
+    print(tabulate(df_benchmark, headers="keys", tablefmt="psql", showindex=False))
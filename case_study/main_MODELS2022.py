@@ -123,40 +123,16 @@ if study_wonka_intrinsic_similarity := True:
     ind_systems = {s: subkgs[s] for s in ind_systems_labels}
 
     ### indsys vs labsys
-    indlabsys_matrix = np.matrix(
-        [
-            [sim.sim_subkgs([sys1, sys2]) for sys2 in lab_systems.values()]
-            for sys1 in ind_systems.values()
-        ]
-    )
-    df_indlabsys = pd.DataFrame(
-        indlabsys_matrix, columns=lab_systems_labels, index=pd.Index(ind_systems_labels)
-    )
+    df_indlabsys = sim.similarity_matrix(ind_systems, lab_systems)
     print(tabulate(df_indlabsys, headers="keys", tablefmt="psql"))
 
     ### labsys vs labsys
-    labsys_matrix = np.matrix(
-        [
-            [sim.sim_subkgs([sys1, sys2]) for sys2 in lab_systems.values()]
-            for sys1 in lab_systems.values()
-        ]
-    )
-    df_labsys = pd.DataFrame(
-        labsys_matrix, columns=lab_systems_labels, index=pd.Index(lab_systems_labels)
-    )
+    df_labsys = sim.similarity_matrix(lab_systems)
     print(tabulate(df_labsys, headers="keys", tablefmt="psql"))
 
     ### indsys vs indsys
-    indsys_matrix = np.matrix(
-        [
-            [sim.sim_subkgs([sys1, sys2]) for sys2 in ind_systems.values()]
-            for sys1 in ind_systems.values()
-        ]
-    )
-    df_indsys = pd.DataFrame(
-        indsys_matrix, columns=ind_systems_labels, index=pd.Index(ind_systems_labels)
-    )
-    print(tabulate(df_indlabsys, headers="keys", tablefmt="psql"))
+    df_indsys = sim.similarity_matrix(ind_systems)
+    print(tabulate(df_indsys, headers="keys", tablefmt="psql"))
 
     ### --- save ---
     df_labsys.to_csv(path_to_results / "labsys_vs_labsys.csv", sep="\t", mode="w")
@@ -307,19 +283,11 @@ dynamic_queries = [
 all_queries = static_queries + dynamic_queries
 
 
-degree_of_validation = {
-    s: val.degree_of_validation(all_queries, skg) for s, skg in subkgs.items()
-}
+degree_of_validation = val.degrees_of_validation(all_queries, subkgs)
 df_validation = pd.DataFrame(degree_of_validation)
 
-degree_of_scalability = {
-    lab: {
-        ind: val.degree_of_scalability(all_queries, (lab_kg, ind_kg))["valid_rows"]
-        for ind, ind_kg in ind_systems.items()
-    }
-    for lab, lab_kg in lab_systems.items()
-}
-df_scalability = pd.DataFrame(degree_of_scalability)
+# validations are cached: each subgraph is validated once (above)
+df_scalability = val.scalability_matrix(all_queries, lab_systems, ind_systems).T
 
 if disp_vnv_metrics := True:
     print(
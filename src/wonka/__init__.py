@@ -1,2 +1,3 @@
 from pathlib import Path
-ROOTDIR = Path(__file__).parent
\ No newline at end of file
+ROOTDIR = Path(__file__).parent
+__version__ = "1.0"
@@ -1,7 +1,15 @@
 ### Local
 from wonka.utils import *
-from wonka.representation import KnowledgeGraph
-from wonka.query import Query, sparql
+from wonka.representation import KnowledgeGraph, CompactKnowledgeGraph
+from wonka.query import (
+    Query,
+    SparqlPool,
+    sparql,
+    sparql_partition,
+    sparql_count,
+    sparql_exists,
+    world_revision,
+)
 
 ###
 ###     Semantic Similarity (intrinsic)
@@ -12,70 +20,118 @@ from wonka.query import Query, sparql
 class SemanticSimilarity:
     onto: Ontology
 
-    def _fetch_conceptlist_from_onto(
-        self, concept: str, concept_method: str, as_str=True
-    ):
-        """TODO result is assumed to be in the right order (owlready2 returns a set -> check ancestor order is always kept)"""
+    def __post_init__(self):
+        self._build_class_tables()
+
+    def _build_class_tables(self):
+        """Precompute the class hierarchy of the ontology (once), as tables of class names:
+        `_ancestors` and `_descendants` of each class `{class: (class, ...)}` (sorted by depth),
+        `_depth` of each class (number of ancestors, incl. itself)
+        NOTE tables must be rebuilt whenever classes are added to (or removed from) the ontology
+        """
+        # classes by name, among the ontology's {class: ThingClass}
+        self._classes = {}
         for cls in self._onto_classes():
-            if str(cls) == concept:
-                conceptlist = list(getattr(cls, concept_method)())
-                if as_str:
-                    conceptlist = [str(c) for c in conceptlist]
-                return conceptlist
-        return ValueError
-
-    def _sort_classes(self, conceptlist: Sequence[Any], as_str=True):
-        """NOTE conceptlist must be a sequence of concepts (owlready2-generated class, not str)"""
-        conceptlist = sorted(conceptlist, key=lambda c: len(c.ancestors()))
+            self._classes.setdefault(str(cls), cls)
+        # every class met (incl. ancestors from imported ontologies) {class: ThingClass}
+        self._entities = dict(self._classes)
+        self._depth = {}
+
+        def sort_by_depth(conceptlist: Sequence) -> tuple[str, ...]:
+            for c in conceptlist:
+                if str(c) not in self._depth:
+                    self._entities.setdefault(str(c), c)
+                    self._depth[str(c)] = len(c.ancestors())
+            names = {str(c) for c in conceptlist}
+            return tuple(sorted(names, key=lambda c: (self._depth[c], c)))
+
+        ### hierarchy of the ontology's classes, and of the classes they are related to
+        self._ancestors, self._descendants = {}, {}
+        pending = list(self._classes)
+        while pending:
+            name = pending.pop()
+            if name in self._ancestors:
+                continue
+            cls = self._entities[name]
+            self._ancestors[name] = sort_by_depth(list(cls.ancestors()))
+            # NOTE subclasses of owl:Thing must be made explicitly so
+            self._descendants[name] = sort_by_depth(
+                list(cls.descendants()) + list(cls.subclasses())
+            )
+            pending.extend(self._ancestors[name] + self._descendants[name])
+
+        ### class indices (`_class_ids`), and descendants as a (class x class) boolean matrix
+        self._class_names = sorted(self._entities)
+        self._class_ids = {name: i for i, name in enumerate(self._class_names)}
+        self._descendant_matrix = np.zeros((len(self._class_names),) * 2, dtype=bool)
+        for name, descendants in self._descendants.items():
+            self._descendant_matrix[
+                self._class_ids[name], [self._class_ids[c] for c in descendants]
+            ] = True
+
+    @functools.cached_property
+    def _lcs_matrix(self) -> np.ndarray:
+        """Lowest common subsumer of each couple of classes (class indices, see `_class_ids`; -1 if none),
+        i.e. their deepest common ancestor (ties broken by name), computed once (on first use)"""
+        n_classes = len(self._class_names)
+        lcs_matrix = np.full((n_classes, n_classes), -1, dtype=np.intp)
+        # descendants (incl. itself) of each class, w.r.t. the ancestor tables
+        descendants = [[] for _ in range(n_classes)]
+        for name, ancestors in self._ancestors.items():
+            for ancestor in ancestors:
+                descendants[self._class_ids[ancestor]].append(self._class_ids[name])
+        # the deepest common ancestors are assigned last
+        for name in sorted(self._class_names, key=lambda c: (-self._depth[c], c))[::-1]:
+            i = self._class_ids[name]
+            lcs_matrix[np.ix_(descendants[i], descendants[i])] = i
+        return lcs_matrix
+
+    def _class_id(self, concept: str) -> int:
+        if (i := self._class_ids.get(str(concept))) is None:
+            raise ValueError(f"Unknown class: {concept}")
+        return i
+
+    def _hierarchy_table(self, table: dict, concept: str, as_str: bool) -> list:
+        if concept not in table:
+            raise ValueError(f"Unknown class: {concept}")
         if as_str:
-            conceptlist = [str(c) for c in conceptlist]
-        return conceptlist
+            return list(table[concept])
+        return [self._entities[c] for c in table[concept]]
 
     def _descendants_of(self, concept, as_str=True):
-        """List all descendants (subclasses) of a class (result includes the concept itself)
+        """List all descendants (subclasses) of a class (result includes the concept itself), sorted by depth
         NOTE subclasses of owl:Thing must be made explicitly so"""
-        ### list descendants
-        desc = self._fetch_conceptlist_from_onto(
-            concept=concept, concept_method="descendants", as_str=False
-        )
-        subcls = self._fetch_conceptlist_from_onto(
-            concept=concept, concept_method="subclasses", as_str=False
-        )
-        subclasses = list(set(desc + subcls))
-        ### sort descendants
-        return self._sort_classes(subclasses, as_str=as_str)
+        return self._hierarchy_table(self._descendants, str(concept), as_str)
 
     def _ancestors_of(self, concept, as_str=True):
-        """List all ancestors of a class (result includes the concept itself)"""
-        ### list ancestors
-        ancestors = self._fetch_conceptlist_from_onto(
-            concept=concept, concept_method="ancestors", as_str=False
-        )
-        ### sort ancestors
-        return self._sort_classes(ancestors, as_str=as_str)
+        """List all ancestors of a class (result includes the concept itself), sorted by depth"""
+        return self._hierarchy_table(self._ancestors, str(concept), as_str)
 
     def _onto_classes(self):
         return [Thing] + list(self.onto.classes())
         # return [self.onto["owl.Thing"]] + list(self.onto.classes())
 
     def _all_classes_in(self, kg: KnowledgeGraph, as_str=True):
-        cls = np.unique([data["class"] for _, data in kg.nodes(data=True)]).tolist()
+        cls = list(kg.class_counts())
         if as_str:
             return cls
         else:
-            return [c for c in self._onto_classes() if str(c) in cls]
+            return [c for name, c in self._classes.items() if name in cls]
 
     def _count_instances(self, concept, kg: KnowledgeGraph):
-        return len([n for n, data in kg.nodes(data=True) if data["class"] in [concept]])
+        return len(kg.instances_of(concept))
 
     def _str2class(self, concept: str):
-        for cls in self._onto_classes():
-            if str(cls) == concept:
-                return cls
+        return self._classes.get(concept)
 
 
 @dataclass
 class HeterogeneousLinSimilarity(SemanticSimilarity):
+    # IC of all classes within each knowledge graph {kg: (version, IC table)} (see `IC_table`)
+    _ic_tables: weakref.WeakKeyDictionary = field(
+        default_factory=weakref.WeakKeyDictionary, init=False, repr=False
+    )
+
     def IC(self, concept: str, kg: KnowledgeGraph) -> np.float64:
         """Information Content of a concept within a knowledge graph
 
@@ -91,21 +147,95 @@ class HeterogeneousLinSimilarity(SemanticSimilarity):
         np.float64
             Information content of the concept within the knowledge graph (negative log likelihood of this concept)
         """
-        subcls = self._descendants_of(concept)
-        subsumers = [n for n, data in kg.nodes(data=True) if data["class"] in subcls]
-        n_instances = len(subsumers)
-        p_c = n_instances / len(kg.nodes())
-        negloglik_p_c = -np.log(p_c)
+        return self.IC_table(kg)[self._class_id(concept)]
+
+    def IC_table(self, kg: KnowledgeGraph) -> np.ndarray:
+        """Information Content of every class within a knowledge graph (see `IC`), indexed as `_class_ids`:
+        instances are counted once per class, then rolled up the class hierarchy (descendant matrix);
+        cached until the knowledge graph changes
+
+        Parameters
+        ----------
+        kg : KnowledgeGraph
+            Knowledge graph
+
+        Returns
+        -------
+        np.ndarray
+            Information content of each class within the knowledge graph
+        """
+        version = getattr(kg, "_version", None)
+        cached = self._ic_tables.get(kg)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        counts = np.zeros(len(self._class_names))
+        for cls, n_instances in kg.class_counts().items():
+            if (i := self._class_ids.get(cls)) is not None:
+                counts[i] = n_instances
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p_c = (self._descendant_matrix @ counts) / len(kg.nodes())
+            negloglik_p_c = -np.log(p_c)
+        self._ic_tables[kg] = (version, negloglik_p_c)
         return negloglik_p_c
 
     def LCS(self, concept1: str, concept2: str, as_str=True) -> Any:
-        anc1 = self._ancestors_of(concept1, as_str=as_str)
-        anc2 = self._ancestors_of(concept2, as_str=as_str)
-        for c1, c2 in zip(*make_same_size(anc1, anc2)):
-            if str(c1) == str(c2):
-                lcs = c1
+        """Lowest common subsumer of two concepts: their deepest common ancestor
+        (ties, i.e. several common ancestors at the same depth, are broken by name)"""
+        lcs = self._lcs_ids([self._class_id(concept1)], [self._class_id(concept2)])
+        lcs = self._class_names[lcs[0, 0]]
+        return lcs if as_str else self._entities[lcs]
+
+    def LCS_matrix(
+        self, concepts1: Sequence[str], concepts2: Sequence[str], as_str=True
+    ) -> np.ndarray:
+        """Lowest common subsumers (see `LCS`) of all couples of concepts `(concepts1[i], concepts2[j])`
+
+        Parameters
+        ----------
+        concepts1 : Sequence[str]
+            Concepts (e.g. the classes of a knowledge graph, see `_all_classes_in`)
+        concepts2 : Sequence[str]
+            Concepts
+
+        Returns
+        -------
+        np.ndarray
+            (len(concepts1), len(concepts2)) array of lowest common subsumers
+        """
+        lcs = self._lcs_ids(
+            [self._class_id(c) for c in concepts1],
+            [self._class_id(c) for c in concepts2],
+        )
+        entities = np.array(
+            self._class_names
+            if as_str
+            else [self._entities[c] for c in self._class_names],
+            dtype=object,
+        )
+        return entities[lcs]
+
+    def _lcs_ids(self, ids1: Sequence[int], ids2: Sequence[int]) -> np.ndarray:
+        lcs = self._lcs_matrix[np.ix_(ids1, ids2)]
+        if (lcs < 0).any():
+            i, j = np.argwhere(lcs < 0)[0]
+            raise ValueError(
+                f"No common ancestor: {self._class_names[ids1[i]]}, {self._class_names[ids2[j]]}"
+            )
         return lcs
-        """lin similarity between two concepts lying in two different knowledge graphs stemming from the same ontology."""
+
+    def _sim_lin_matrix(
+        self,
+        concepts1: Sequence[str],
+        concepts2: Sequence[str],
+        kg: tuple[KnowledgeGraph, KnowledgeGraph],
+    ) -> np.ndarray:
+        """Lin similarity (see `sim_lin`) of all couples of concepts `(concepts1[i], concepts2[j])`"""
+        ic_table1, ic_table2 = self.IC_table(kg[0]), self.IC_table(kg[1])
+        ids1 = [self._class_id(c) for c in concepts1]
+        ids2 = [self._class_id(c) for c in concepts2]
+        return _lin_similarities(
+            self._lcs_ids(ids1, ids2), ids1, ids2, ic_table1, ic_table2
+        )
 
     def sim_lin(
         self, concepts: tuple[str, str], kg: tuple[KnowledgeGraph, KnowledgeGraph]
@@ -124,14 +254,11 @@ class HeterogeneousLinSimilarity(SemanticSimilarity):
         np.float64
             Lin similarity between the two concepts, takes values in [0, 1]
         """
-        subkg1, subkg2 = kg[0], kg[1]
+        ic_table1, ic_table2 = self.IC_table(kg[0]), self.IC_table(kg[1])
         c1, c2 = concepts[0], concepts[1]
-        lcs = self.LCS(c1, c2)
-        ic_lcs1 = self.IC(lcs, subkg1)
-        ic_lcs2 = self.IC(lcs, subkg2)
-        ic1 = self.IC(c1, subkg1)
-        ic2 = self.IC(c2, subkg2)
-        sim = (ic_lcs1 + ic_lcs2) / (ic1 + ic2)
+        lcs = self._class_id(self.LCS(c1, c2))
+        ic1, ic2 = ic_table1[self._class_id(c1)], ic_table2[self._class_id(c2)]
+        sim = (ic_table1[lcs] + ic_table2[lcs]) / (ic1 + ic2)
         return sim
 
     def sim_subkgs(self, kg: tuple[KnowledgeGraph, KnowledgeGraph]) -> np.float64:
@@ -147,17 +274,99 @@ class HeterogeneousLinSimilarity(SemanticSimilarity):
         np.float64
             Similarity between two knowledge graphs
         """
-        maxsims_1 = np.array(
-            [self.maxSim(data["class"], *kg) for _, data in kg[0].nodes(data=True)]
+        lcs_matrix, profiles = self._profiles(kg)
+        return _sim_profiles(lcs_matrix, *profiles)
+
+    def similarity_matrix(
+        self,
+        subkgs_a: Mapping[Hashable, KnowledgeGraph],
+        subkgs_b: Mapping[Hashable, KnowledgeGraph] = None,
+        n_jobs: int = 1,
+    ) -> pd.DataFrame:
+        """Similarity (see `sim_subkgs`) between each couple of knowledge subgraphs `(subkg_a, subkg_b)`:
+        each couple of graphs is compared once (similarity is symmetric), IC tables are computed once per graph
+
+        Parameters
+        ----------
+        subkgs_a : Mapping[Hashable, KnowledgeGraph]
+            Knowledge subgraphs `{key: subgraph}` (rows)
+        subkgs_b : Mapping[Hashable, KnowledgeGraph], optional
+            Knowledge subgraphs `{key: subgraph}` (columns), by default None (`subkgs_a`)
+        n_jobs : int, optional
+            number of worker processes comparing graphs (None: number of CPUs), by default 1 (sequentially)
+
+        Returns
+        -------
+        pd.DataFrame
+            similarity between each couple of subgraphs
+        """
+        subkgs_b = subkgs_a if subkgs_b is None else subkgs_b
+        ### distinct graphs, and distinct (unordered) couples of graphs
+        graphs = {id(g): g for g in [*subkgs_a.values(), *subkgs_b.values()]}
+        position = {key: i for i, key in enumerate(graphs)}
+        couples = list(
+            {
+                tuple(sorted((position[id(g_a)], position[id(g_b)])))
+                for g_a in subkgs_a.values()
+                for g_b in subkgs_b.values()
+            }
         )
-        maxsims_2 = np.array(
-            [
-                self.maxSim(data["class"], *kg[::-1])
-                for _, data in kg[1].nodes(data=True)
+        lcs_matrix, profiles = self._profiles(list(graphs.values()))
+        if n_jobs == 1:
+            sims = [
+                _sim_profiles(lcs_matrix, profiles[i], profiles[j]) for i, j in couples
             ]
+        else:
+            n_jobs = n_jobs or os.cpu_count()
+            chunksize = -(-len(couples) // (4 * n_jobs)) or 1
+            with ProcessPoolExecutor(
+                n_jobs,
+                initializer=_init_similarity_worker,
+                initargs=(lcs_matrix, profiles),
+            ) as executor:
+                sims = list(
+                    executor.map(_similarity_worker, couples, chunksize=chunksize)
+                )
+        sims = dict(zip(couples, sims))
+        return pd.DataFrame(
+            [
+                [
+                    sims[tuple(sorted((position[id(g_a)], position[id(g_b)])))]
+                    for g_b in subkgs_b.values()
+                ]
+                for g_a in subkgs_a.values()
+            ],
+            index=pd.Index(list(subkgs_a)),
+            columns=list(subkgs_b),
         )
-        scores = 0.5 * np.append(maxsims_1 / maxsims_1.size, maxsims_2 / maxsims_2.size)
-        return scores.sum()
+
+    def _profiles(
+        self, kgs: Sequence[KnowledgeGraph]
+    ) -> tuple[np.ndarray, list[tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+        """Lowest common subsumers of the classes of knowledge graphs and each graph's profile:
+        its distinct classes, their number of instances, and its IC table;
+        class indices are local to these graphs (picklable, compact tables)"""
+        class_counts = [kg.class_counts() for kg in kgs]
+        ids = [
+            np.array([self._class_id(c) for c in counts], dtype=np.intp)
+            for counts in class_counts
+        ]
+        ### classes of the graphs and their LCS (raises if they have no common ancestor)
+        classes = np.unique(np.concatenate([np.empty(0, dtype=np.intp), *ids]))
+        lcs = self._lcs_ids(classes, classes)
+        local_ids = np.unique(np.concatenate([classes, lcs.ravel()]))
+        lcs_matrix = np.full((len(local_ids),) * 2, -1, dtype=np.intp)
+        classes = np.searchsorted(local_ids, classes)
+        lcs_matrix[np.ix_(classes, classes)] = np.searchsorted(local_ids, lcs)
+        profiles = [
+            (
+                np.searchsorted(local_ids, kg_ids),
+                np.array(list(counts.values())),
+                self.IC_table(kg)[local_ids],
+            )
+            for kg, kg_ids, counts in zip(kgs, ids, class_counts)
+        ]
+        return lcs_matrix, profiles
 
     def maxSim(
         self, concept: str, in_kg: KnowledgeGraph, wrt_kg_ref: KnowledgeGraph
@@ -179,10 +388,64 @@ class HeterogeneousLinSimilarity(SemanticSimilarity):
         np.float64
             Maximum similarity between `concept` and `wrt_kg_ref` (each concept thereof)
         """
-        sim = 0.0
-        for cls in self._all_classes_in(wrt_kg_ref):
-            sim = np.nanmax([sim, self.sim_lin([concept, cls], [in_kg, wrt_kg_ref])])
-        return sim
+        sims = self._sim_lin_matrix(
+            [concept], self._all_classes_in(wrt_kg_ref), [in_kg, wrt_kg_ref]
+        )
+        return np.nanmax(np.append(0.0, sims))
+
+
+def _lin_similarities(
+    lcs: np.ndarray,
+    ids1: Sequence[int],
+    ids2: Sequence[int],
+    ic_table1: np.ndarray,
+    ic_table2: np.ndarray,
+) -> np.ndarray:
+    """Lin similarities of couples of classes `(ids1[i], ids2[j])` from their LCS and IC tables
+    (see `HeterogeneousLinSimilarity.sim_lin`)"""
+    # (NaN where ICs are infinite, i.e. concepts missing from the graphs)
+    with np.errstate(invalid="ignore"):
+        return (ic_table1[lcs] + ic_table2[lcs]) / np.add.outer(
+            ic_table1[ids1], ic_table2[ids2]
+        )
+
+
+def _sim_profiles(
+    lcs_matrix: np.ndarray, profile1: tuple, profile2: tuple
+) -> np.float64:
+    """Similarity between two knowledge graphs (see `HeterogeneousLinSimilarity.sim_subkgs`)
+    from their profiles (see `HeterogeneousLinSimilarity._profiles`)"""
+    (ids1, n_instances1, ic_table1), (ids2, n_instances2, ic_table2) = (
+        profile1,
+        profile2,
+    )
+    ### similarities between the distinct classes of both graphs (instead of their nodes)
+    sims = _lin_similarities(
+        lcs_matrix[np.ix_(ids1, ids2)], ids1, ids2, ic_table1, ic_table2
+    )
+    # highest similarity of each class of a graph w.r.t. the other graph (see `maxSim`)
+    maxsims_1 = np.fmax.reduce(sims, axis=1, initial=0.0)
+    maxsims_2 = np.fmax.reduce(sims, axis=0, initial=0.0)
+    ### average over nodes, i.e. weighted by the number of instances of each class
+    score = 0.0
+    for maxsims, n_instances in [(maxsims_1, n_instances1), (maxsims_2, n_instances2)]:
+        if n_instances.sum():
+            score += 0.5 * (n_instances @ maxsims) / n_instances.sum()
+    return score
+
+
+# LCS matrix and graph profiles of a worker process (see `HeterogeneousLinSimilarity.similarity_matrix`)
+_worker_profiles: tuple = None
+
+
+def _init_similarity_worker(lcs_matrix: np.ndarray, profiles: list):
+    global _worker_profiles
+    _worker_profiles = lcs_matrix, profiles
+
+
+def _similarity_worker(couple: tuple[int, int]) -> np.float64:
+    lcs_matrix, profiles = _worker_profiles
+    return _sim_profiles(lcs_matrix, profiles[couple[0]], profiles[couple[1]])
 
 
 ###
@@ -194,11 +457,81 @@ class HeterogeneousLinSimilarity(SemanticSimilarity):
 class ValidationMetric:
 
     world: World = default_world
+    # let owlready2 count (and stop at the first result of) queries over the whole world
+    # (see `sparql_count`, `sparql_exists`); ignored when restricting to a knowledge graph
+    native: bool = False
+    # number of worker processes running the queries (see `SparqlPool`), by default 1 (sequentially)
+    n_jobs: int = 1
+    # pool of worker processes, shared by successive calls until the world changes (see `close`)
+    _pool: SparqlPool = field(default=None, init=False, repr=False)
+    _pool_revision: int = field(default=None, init=False, repr=False)
+    # degrees of validation of each knowledge graph {kg: {(queries, version): metrics}}
+    _cache: weakref.WeakKeyDictionary = field(
+        default_factory=weakref.WeakKeyDictionary, init=False, repr=False
+    )
+
+    def _sparql_pool(self) -> SparqlPool:
+        """Pool of worker processes querying a snapshot of the world, created anew once the world changes"""
+        if self._pool is None or self._pool_revision != world_revision(self.world):
+            self.close()
+            self._pool = SparqlPool(self.world, self.n_jobs)
+            self._pool_revision = world_revision(self.world)
+        return self._pool
+
+    def close(self):
+        """Shut down the pool of worker processes (if `n_jobs != 1`), created again when needed"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = self._pool_revision = None
+
+    def _cache_key(
+        self, queries: Sequence[tuple[Query | str, Query | str]], kg: KnowledgeGraph
+    ) -> tuple:
+        """Cache key of degrees of validation, invalidated whenever `kg`'s structure or the world changes"""
+        return (
+            tuple((str(q_ok), str(q_nok)) for q_ok, q_nok in queries),
+            getattr(kg, "_version", None),
+            world_revision(self.world),
+        )
 
-    def degree_of_validation(
+    @staticmethod
+    def _cacheable(kg: KnowledgeGraph) -> bool:
+        """Whether degrees of validation of `kg` can be cached: `kg` is versioned
+        (see `KnowledgeGraph._version`) or read-only (`CompactKnowledgeGraph`)"""
+        return kg is not None and (
+            getattr(kg, "_version", None) is not None
+            or isinstance(kg, CompactKnowledgeGraph)
+        )
+
+    def _cached(
+        self, queries: Sequence[tuple[Query | str, Query | str]], kg: KnowledgeGraph
+    ) -> dict | None:
+        if not self._cacheable(kg) or kg not in self._cache:
+            return None
+        return self._cache[kg].get(self._cache_key(queries, kg))
+
+    def _store(
         self,
         queries: Sequence[tuple[Query | str, Query | str]],
         kg: KnowledgeGraph,
+        metrics: dict,
+    ) -> dict:
+        if self._cacheable(kg):
+            # only keep the latest version of each knowledge graph (and of the world)
+            key = self._cache_key(queries, kg)
+            self._cache[kg] = {
+                cached_key: value
+                for cached_key, value in self._cache.get(kg, {}).items()
+                if cached_key[1:] == key[1:]
+            }
+            self._cache[kg][key] = metrics
+        return metrics
+
+    def degree_of_validation(
+        self,
+        queries: Sequence[tuple[Query | str, Query | str]],
+        kg: KnowledgeGraph = None,
+        only_valid_req: bool = False,
     ) -> dict:
         """Compute degrees of requirements validation
 
@@ -206,8 +539,11 @@ class ValidationMetric:
         ----------
         queries : Sequence[tuple[Query  |  str, Query  |  str]]
             Couples of queries (validating & non-validating)
-        kg : KnowledgeGraph
-            Query only within this knowledge graph
+        kg : KnowledgeGraph, optional
+            Query only within this knowledge graph, by default None (whole world)
+        only_valid_req : bool, optional
+            Only compute `valid_req`, by default False: validating queries are not run,
+            non-validating queries are only run until a first result is found
 
         Returns
         -------
@@ -217,23 +553,109 @@ class ValidationMetric:
                           over the total number of query results.
         """
 
+        if (cached := self._cached(queries, kg)) is not None:
+            return {"valid_req": cached["valid_req"]} if only_valid_req else cached
+
+        # results within a knowledge graph are filtered in Python, never natively
+        native = self.native and kg is None
+        if only_valid_req:
+            n_valid_req = sum(
+                not sparql_exists(query_nok, self.world, kg, native=native)
+                for _, query_nok in queries
+            )
+            return {"valid_req": n_valid_req / len(queries)}
+
         counts = {"valid_req": 0, "valid_rows": 0, "total_rows": 0}
 
-        for query_ok, query_nok in queries:
-            df_qok = sparql(query_ok, self.world, kg)
-            df_qnok = sparql(query_nok, self.world, kg)
+        all_queries = [query for couple in queries for query in couple]
+        if self.n_jobs != 1:
+            n_rows = [len(df) for df in self._sparql_pool().map(all_queries, kg)]
+        else:
+            n_rows = [
+                sparql_count(query, self.world, kg, native=native)
+                for query in all_queries
+            ]
 
+        for n_qok, n_qnok in zip(n_rows[::2], n_rows[1::2]):
             # total number of instances the requirement is affected by
-            counts["total_rows"] += len(df_qok) + len(df_qnok)
+            counts["total_rows"] += n_qok + n_qnok
             # number of instances that validate the requirement
-            counts["valid_rows"] += len(df_qok)
+            counts["valid_rows"] += n_qok
             # whether requirement is validated
-            counts["valid_req"] += len(df_qnok) == 0
+            counts["valid_req"] += n_qnok == 0
 
         metrics = {
             "valid_req": counts["valid_req"] / len(queries),
             "valid_rows": counts["valid_rows"] / counts["total_rows"],
         }
+        return self._store(queries, kg, metrics)
+
+    def degrees_of_validation(
+        self,
+        queries: Sequence[tuple[Query | str, Query | str]],
+        subkgs: Mapping[Hashable, KnowledgeGraph],
+    ) -> dict[Hashable, dict]:
+        """Compute degrees of requirements validation of several knowledge subgraphs at once
+        (see `degree_of_validation`): each query is run once, its results being partitioned
+        among the subgraphs (see `sparql_partition`)
+
+        Parameters
+        ----------
+        queries : Sequence[tuple[Query  |  str, Query  |  str]]
+            Couples of queries (validating & non-validating)
+        subkgs : Mapping[Hashable, KnowledgeGraph]
+            Knowledge subgraphs `{key: subgraph}` (e.g. from `KnowledgeGraph.divide`)
+
+        Returns
+        -------
+        dict[Hashable, dict]
+            degrees of validation of each subgraph `{key: {"valid_req": ..., "valid_rows": ...}}`
+        """
+
+        metrics = {key: self._cached(queries, subkg) for key, subkg in subkgs.items()}
+        missing = {key: subkgs[key] for key, value in metrics.items() if value is None}
+        if len(missing) == 1:
+            ((key, subkg),) = missing.items()
+            metrics[key] = self.degree_of_validation(queries, subkg)
+        elif missing:
+            metrics.update(self._degrees_of_validation(queries, missing))
+        return metrics
+
+    def _degrees_of_validation(
+        self,
+        queries: Sequence[tuple[Query | str, Query | str]],
+        subkgs: Mapping[Hashable, KnowledgeGraph],
+    ) -> dict[Hashable, dict]:
+        counts = {
+            key: {"valid_req": 0, "valid_rows": 0, "total_rows": 0} for key in subkgs
+        }
+
+        all_queries = [query for couple in queries for query in couple]
+        if self.n_jobs != 1:
+            n_rows = self._sparql_pool().partition(all_queries, subkgs, count=True)
+        else:
+            n_rows = [
+                sparql_partition(query, subkgs, self.world, count=True)
+                for query in all_queries
+            ]
+
+        for n_qok, n_qnok in zip(n_rows[::2], n_rows[1::2]):
+            for key, counts_kg in counts.items():
+                counts_kg["total_rows"] += n_qok[key] + n_qnok[key]
+                counts_kg["valid_rows"] += n_qok[key]
+                counts_kg["valid_req"] += n_qnok[key] == 0
+
+        metrics = {
+            key: self._store(
+                queries,
+                subkgs[key],
+                {
+                    "valid_req": counts_kg["valid_req"] / len(queries),
+                    "valid_rows": counts_kg["valid_rows"] / counts_kg["total_rows"],
+                },
+            )
+            for key, counts_kg in counts.items()
+        }
         return metrics
 
     def degree_of_scalability(
@@ -241,16 +663,72 @@ class ValidationMetric:
         queries: Sequence[tuple[Query | str, Query | str]],
         kg: tuple[KnowledgeGraph, KnowledgeGraph],
     ) -> dict:
-        metrics = {
-            "valid_req": 1
-            - (
-                self.degree_of_validation(queries, kg[0])["valid_req"]
-                - self.degree_of_validation(queries, kg[1])["valid_req"]
-            ),
-            "valid_rows": 1
-            - (
-                self.degree_of_validation(queries, kg[0])["valid_rows"]
-                - self.degree_of_validation(queries, kg[1])["valid_rows"]
-            ),
+        """Similarity between the degrees of validation of two knowledge graphs
+        (`1 - (validation(kg[0]) - validation(kg[1]))`, each validation being computed once and cached)
+
+        Parameters
+        ----------
+        queries : Sequence[tuple[Query  |  str, Query  |  str]]
+            Couples of queries (validating & non-validating)
+        kg : tuple[KnowledgeGraph, KnowledgeGraph]
+            Two knowledge graphs
+
+        Returns
+        -------
+        dict
+            degrees of scalability `{"valid_req": ..., "valid_rows": ...}` (see `degree_of_validation`)
+        """
+        validations = self.degrees_of_validation(queries, dict(enumerate(kg)))
+        return self._scalability(validations[0], validations[1])
+
+    def scalability_matrix(
+        self,
+        queries: Sequence[tuple[Query | str, Query | str]],
+        subkgs_a: Mapping[Hashable, KnowledgeGraph],
+        subkgs_b: Mapping[Hashable, KnowledgeGraph],
+        metric: str = "valid_rows",
+    ) -> pd.DataFrame:
+        """Degrees of scalability of each couple of knowledge subgraphs (see `degree_of_scalability`),
+        the validation of each subgraph being computed once (see `degrees_of_validation`)
+
+        Parameters
+        ----------
+        queries : Sequence[tuple[Query  |  str, Query  |  str]]
+            Couples of queries (validating & non-validating)
+        subkgs_a : Mapping[Hashable, KnowledgeGraph]
+            Knowledge subgraphs `{key: subgraph}` (rows)
+        subkgs_b : Mapping[Hashable, KnowledgeGraph]
+            Knowledge subgraphs `{key: subgraph}` (columns)
+        metric : str, optional
+            "valid_req" or "valid_rows", by default "valid_rows"
+
+        Returns
+        -------
+        pd.DataFrame
+            degree of scalability of each couple `(subkg_a, subkg_b)`
+        """
+        # validate each distinct subgraph once (subgraphs may appear in both mappings)
+        distinct = {
+            id(subkg): subkg for subkg in [*subkgs_a.values(), *subkgs_b.values()]
+        }
+        validations = self.degrees_of_validation(queries, distinct)
+        return pd.DataFrame(
+            [
+                [
+                    self._scalability(
+                        validations[id(subkg_a)], validations[id(subkg_b)]
+                    )[metric]
+                    for subkg_b in subkgs_b.values()
+                ]
+                for subkg_a in subkgs_a.values()
+            ],
+            index=pd.Index(list(subkgs_a)),
+            columns=list(subkgs_b),
+        )
+
+    @staticmethod
+    def _scalability(validation_a: dict, validation_b: dict) -> dict:
+        return {
+            metric: 1 - (validation_a[metric] - validation_b[metric])
+            for metric in ["valid_req", "valid_rows"]
         }
-        return metrics
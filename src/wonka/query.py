@@ -16,12 +16,99 @@ class Query:
 
     def _load_query(self, path_to_query: str | Path) -> Query:
         """load a query file (.rq)"""
-        return "".join(open(str(path_to_query)))
+        stat = os.stat(path_to_query)
+        return _read_query_file(str(path_to_query), stat.st_mtime_ns, stat.st_size)
 
     def __repr__(self) -> str:
         return str(self._query)
 
 
+@functools.lru_cache(maxsize=1024)
+def _read_query_file(path_to_query: str, mtime_ns: int, size: int) -> str:
+    """content of a query file, cached as long as the file is unchanged (modification time and size)"""
+    return "".join(open(path_to_query))
+
+
+@functools.lru_cache(maxsize=1024)
+def translate_query(query: str):
+    """rdflib's SPARQL algebra (`translateQuery`) of a query and the prefixes it declares `{namespace: prefix}`,
+    cached (LRU) on the query's text
+    NOTE translated queries are shared between calls, they must not be modified"""
+    parsed = parseQuery(query)  # (altered by the translation)
+    prefixes = _declared_prefixes(parsed)
+    return translateQuery(parsed), prefixes
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_query(query: str):
+    """rdflib's parse tree (`parseQuery`) of a query, prefixed names and literals being resolved,
+    and the prefixes it declares `{namespace: prefix}`, cached (LRU) on the query's text;
+    unlike the algebra (see `translate_query`), the parse tree keeps every pattern where it is written
+    (e.g. filters nested in `EXISTS` patterns, which the translation moves out of untranslated patterns)
+    NOTE parse trees are shared between calls, they must not be modified"""
+    parsed = parseQuery(query)
+    prologue = algebra.translatePrologue(parsed[0], None)
+    tree = algebra.traverse(
+        parsed[1],
+        visitPost=functools.partial(algebra.translatePName, prologue=prologue),
+    )
+    return tree, _declared_prefixes(parsed)
+
+
+def _declared_prefixes(parsed) -> dict[str, str]:
+    """prefixes declared by a parsed query `{namespace: prefix}`"""
+    return {
+        str(declaration["iri"]): declaration.get("prefix", "")
+        for declaration in parsed[0]
+        if declaration.name == "PrefixDecl"
+    }
+
+
+# IRIs and strings (long and short, with escape sequences), runs of whitespaces and comments
+_QUERY_TOKENS = re.compile(
+    r"(?P<term><[^<>\s]*>|"
+    + "|".join(
+        rf"{q * 3}(?:(?:{q}|{q * 2})?(?:[^{q}\\]|\\.))*{q * 3}|{q}(?:[^{q}\\\n]|\\.)*{q}"
+        for q in "\"'"
+    )
+    + r")|(?P<blank>(?:\s|#[^\n]*)+)"
+)
+
+
+def _strip_comments(query: Query | str, collapse: bool = False) -> str:
+    """Query text without comments (and with whitespaces collapsed if `collapse`), except in IRIs and strings
+
+    Raises
+    ------
+    ValueError
+        if strings cannot be delimited (e.g. unterminated strings)
+    """
+    query, pieces, end = str(query), [], 0
+    for token in _QUERY_TOKENS.finditer(query):
+        pieces.append(query[end : token.start()])
+        if token["term"] is not None:
+            pieces.append(token["term"])
+        elif collapse:
+            pieces.append(" ")
+        else:
+            pieces.append(re.sub(r"#[^\n]*", "", token["blank"]))
+        end = token.end()
+    pieces.append(query[end:])
+    # quotes outside of IRIs and strings: strings could not be delimited
+    if any('"' in piece or "'" in piece for piece in pieces[::2]):
+        raise ValueError("unterminated string")
+    return "".join(pieces)
+
+
+def normalize_query(query: Query | str) -> str:
+    """Query text without comments, whitespaces being collapsed (except in IRIs and strings),
+    or the query's text as is if its strings cannot be delimited"""
+    try:
+        return _strip_comments(query, collapse=True).strip()
+    except ValueError:
+        return str(query)
+
+
 # def load_query(path_to_query: str | Path) -> Query:
 #     """load a query file (.rq)"""
 #     return "".join(open(str(path_to_query)))
@@ -53,37 +140,552 @@ def sparql(
     -------
     pd.DataFrame
         query results as a DataFrame (each column corresponds to a variable)
+
+    NOTE results are cached (LRU, see `RESULTS_CACHE_SIZE`) until the world changes
+    """
+
+    ### Run SPARQL query, streaming results into a DataFrame (unless cached)
+    key = _results_key(query, world)
+    df_query_results = _cached_results(key)
+    if df_query_results is None:
+        df_query_results = _results_frame(world.sparql(str(query)), list(key[-1]))
+        _cache_results(key, df_query_results)
+    ### Drop rows with instances which do not belong to the knowledge or query graph
+    if kg is not None and len(df_query_results):
+        return df_query_results[_in_kg(df_query_results, _kg_instances(kg))]
+    # (cached results are shared)
+    return df_query_results.copy()
+
+
+def sparql_partition(
+    query: Query | str,
+    subkgs: Mapping[Hashable, Any],
+    world: World = default_world,
+    count: bool = False,
+) -> dict[Hashable, pd.DataFrame | int]:
+    """Evaluate a SPARQL query once and partition its results among knowledge subgraphs
+    (e.g. from `KnowledgeGraph.divide`): the results of each subgraph are those
+    `sparql(query, world, subkg)` would return.
+
+    Parameters
+    ----------
+    query : Query | str
+        query to run
+    subkgs : Mapping[Hashable, KnowledgeGraph]
+        knowledge subgraphs `{key: subgraph}`
+    world : World, optional
+        world containing the ontology, by default default_world
+    count : bool, optional
+        whether to return the number of results of each subgraph instead of the results, by default False
+
+    Returns
+    -------
+    dict[Hashable, pd.DataFrame | int]
+        query results (or number of results) of each subgraph `{key: results}`
     """
+    return _partition(sparql(query, world), subkgs, count)
 
-    ### Run SPARQL query
-    query_results = [
-        [format_iri(indiv) for indiv in row] for row in list(world.sparql(str(query)))
-    ]
+
+def _partition(
+    df_query_results: pd.DataFrame, subkgs: Mapping[Hashable, Any], count: bool
+) -> dict[Hashable, pd.DataFrame | int]:
+    """Partition query results among knowledge subgraphs (see `sparql_partition`)"""
+    keys = list(subkgs)
+    if not len(df_query_results):
+        return {key: 0 if count else df_query_results for key in keys}
+
+    component = _shared_attr(subkgs.values(), "_component")
+    trimmed = _shared_attr(subkgs.values(), "_trimmed")
+    if component is None or trimmed is None:
+        ### not divided at once: filter results subgraph by subgraph
+        masks = {
+            key: _in_kg(df_query_results, _kg_instances(subkg))
+            for key, subkg in subkgs.items()
+        }
+        if count:
+            return {key: int(mask.sum()) for key, mask in masks.items()}
+        return {key: df_query_results[mask] for key, mask in masks.items()}
+
+    ### label rows with the subgraph (node -> subgraph map) they belong to
+    # subgraphs are identified by the component of (any of) their nodes, whatever their keys in `subkgs`
+    components = [component.get(next(iter(subkg), None)) for subkg in subkgs.values()]
+    index = {c: i for i, c in reversed(list(enumerate(components))) if c is not None}
+    positions = [index.get(c) for c in components]
+    labels = _subgraph_labels(df_query_results, component, trimmed, index)
+    # rows only made of border nodes (or missing values) belong to every subgraph
+    shared = np.flatnonzero(labels == -1)
+    if count:
+        counts = np.append(np.bincount(labels[labels >= 0], minlength=len(keys)), 0)
+        return {
+            key: int(counts[-1 if i is None else i]) + len(shared)
+            for key, i in zip(keys, positions)
+        }
+    order = np.argsort(labels, kind="stable")
+    bounds = np.searchsorted(labels[order], np.arange(len(keys) + 1))
+    return {
+        key: df_query_results.iloc[
+            shared
+            if i is None
+            else np.sort(np.concatenate([order[bounds[i] : bounds[i + 1]], shared]))
+        ]
+        for key, i in zip(keys, positions)
+    }
+
+
+def sparql_iter(
+    query: Query | str,
+    world: World = default_world,
+    kg=None,
+    chunksize: int = None,
+) -> Iterator[tuple[str, ...]] | Iterator[pd.DataFrame]:
+    """Evaluate a SPARQL query lazily, yielding its results (see `sparql`) row by row
+    or as DataFrames of (at most) `chunksize` rows, indexed as `sparql` would
+
+    Parameters
+    ----------
+    query : Query | str
+        query to run
+    world : World, optional
+        world containing the ontology, by default default_world
+    kg : KnowledgeGraph | QueryGraph, optional
+        restrict to a specific knowledge graph (see `sparql`), by default None
+    chunksize : int, optional
+        number of rows of each DataFrame, by default None (yield rows, as tuples of values)
+
+    Yields
+    ------
+    Iterator[tuple[str, ...]] | Iterator[pd.DataFrame]
+        query results, row by row (or chunk by chunk)
+    """
+    rows = _iter_rows(query, world, kg)
+    if chunksize is None:
+        for _, row in rows:
+            yield row
+        return
     query_vars = vars_from_query(str(query))
-    ### Turn query results into DataFrame
-    fetchvar = lambda i: f"x{i}" if query_vars is None else query_vars[i]
-    # add missing values as the variable's name
-    if query_results:
-        for icol, var in enumerate(query_vars):
-            if icol >= np.array(query_results).shape[1]:
-                for irow in range(len(query_results)):
-                    query_results[irow].append(var)
-    # convert to DataFrame
-    if query_results:
-        df_query_results = pd.DataFrame(
-            {
-                fetchvar(i): row
-                for i, row in enumerate(np.array(query_results).T.tolist())
-            }
+    chunk = []
+    for i_row, row in rows:
+        chunk.append((i_row, row))
+        if len(chunk) == chunksize:
+            yield _chunk_frame(chunk, query_vars)
+            chunk = []
+    if chunk:
+        yield _chunk_frame(chunk, query_vars)
+
+
+def sparql_count(
+    query: Query | str, world: World = default_world, kg=None, native: bool = False
+) -> int:
+    """Number of results of a SPARQL query (see `sparql`), counted while streaming them,
+    or by owlready2's SPARQL engine if `native` (see `count_query`)
+
+    `native` is ignored (with a warning) when restricting to `kg`, whose results are filtered in Python.
+    """
+    if (df_query_results := _cached_results(_results_key(query, world))) is not None:
+        if kg is None or not len(df_query_results):
+            return len(df_query_results)
+        return int(_in_kg(df_query_results, _kg_instances(kg)).sum())
+    if kg is not None and native:
+        log.warning(
+            "Cannot count results natively within a knowledge graph, counting them in Python"
+        )
+    if kg is None:
+        if native:
+            try:
+                return int(list(world.sparql(count_query(query)))[0][0])
+            except (ValueError, sqlite3.Error) as e:
+                # not rewritable, or not translated to SQL by owlready2 (e.g. aggregates over FILTER NOT EXISTS)
+                log.debug(f"Counting results in Python: {e}")
+        return sum(1 for _ in world.sparql(str(query)))
+    return sum(1 for _ in _iter_rows(query, world, kg))
+
+
+def sparql_exists(
+    query: Query | str, world: World = default_world, kg=None, native: bool = False
+) -> bool:
+    """Whether a SPARQL query has any result (see `sparql`), evaluating it until a first result is found
+    (with `LIMIT 1` if `native`, see `exists_query`)
+
+    `native` is ignored (with a warning) when restricting to `kg`, whose results are filtered in Python.
+    """
+    if _cached_results(_results_key(query, world)) is not None:
+        return sparql_count(query, world, kg) > 0
+    if kg is not None and native:
+        log.warning(
+            "Cannot look for a result natively within a knowledge graph, evaluating it in Python"
+        )
+    if kg is None and native:
+        try:
+            return len(list(world.sparql(exists_query(query)))) > 0
+        except (ValueError, sqlite3.Error) as e:
+            log.debug(f"Looking for a result in Python: {e}")
+    return next(_iter_rows(query, world, kg), None) is not None
+
+
+def count_query(query: Query | str) -> str:
+    """Rewrite a SELECT query into a query counting its results `SELECT (COUNT(...) AS ?count)`;
+    DISTINCT solutions are counted as distinct concatenations of their encoded values (see `_distinct_key`)
+
+    Raises
+    ------
+    ValueError
+        if the query cannot be rewritten (e.g. not a SELECT query, LIMIT, GROUP BY, projected expressions,
+        strings that cannot be delimited)
+    """
+    text, head = _select_clause(query)
+    distinct, projection = head["distinct"], head["projection"].strip()
+    if not distinct:
+        count = "COUNT(*)"
+    else:
+        if projection == "*":
+            translated, _ = translate_query(str(query))
+            query_vars = [f"?{var}" for var in translated.algebra.PV]
+        else:
+            query_vars = projection.split()
+        values = ", ".join(_distinct_key(var) for var in query_vars)
+        count = f"COUNT(DISTINCT CONCAT({values}))"
+    return f"{text[: head.start()]}SELECT ({count} AS ?count) WHERE{text[head.end() :]}"
+
+
+def _distinct_key(var: str) -> str:
+    """SPARQL expression encoding the value of `var` into a string, such that concatenations of
+    encoded values are equal iff the values are (IRI or literal, lexical form, datatype, language, unbound)
+
+    Strings are length-prefixed (`<length>:<string>`) rather than joined with a separator, which could
+    appear within values (owlready2 subqueries and `REPLACE` cannot be used to count distinct rows otherwise).
+    """
+    value, datatype, lang = f"STR({var})", f"STR(DATATYPE({var}))", f"LANG({var})"
+    fields = ", ".join(f'STR(STRLEN({x})), ":", {x}' for x in (value, datatype, lang))
+    literal = f'CONCAT("l", {fields})'
+    resource = f'CONCAT("i", STR(STRLEN({value})), ":", {value})'
+    return f'COALESCE(IF(isLiteral({var}), {literal}, {resource}), "u")'
+
+
+def exists_query(query: Query | str) -> str:
+    """Rewrite a SELECT query so that it stops at its first result (`LIMIT 1`)
+
+    Raises
+    ------
+    ValueError
+        if the query cannot be rewritten (e.g. not a SELECT query, LIMIT, GROUP BY, projected expressions,
+        strings that cannot be delimited)
+    """
+    text, _ = _select_clause(query)
+    return f"{text.rstrip()}\nLIMIT 1"
+
+
+def _select_clause(query: Query | str) -> tuple[str, re.Match]:
+    """Query without comments and match of its SELECT clause (`distinct`, `projection`)"""
+    # (raises ValueError if strings cannot be delimited)
+    text = _strip_comments(query)
+    heads = list(
+        re.finditer(
+            r"\bSELECT\s+(?P<distinct>(?:DISTINCT|REDUCED)\s+)?(?P<projection>[^{]*?)\s*\bWHERE\b",
+            text,
+            flags=re.IGNORECASE,
         )
-        ### Drop rows with instances which do not belong to the knowledge or query graph
+    )
+    if len(heads) != 1:
+        raise ValueError("not a single SELECT query")
+    head = heads[0]
+    if head["distinct"] and head["distinct"].strip().upper() == "REDUCED":
+        raise ValueError("REDUCED query")
+    if not re.fullmatch(r"\*|(\?\w+\s*)+", head["projection"].strip()):
+        raise ValueError("projected expressions")
+    if re.search(r"\b(LIMIT|OFFSET|GROUP\s+BY|HAVING)\b", text, flags=re.IGNORECASE):
+        raise ValueError("solution modifiers")
+    return text, head
+
+
+def sparql_first(
+    query: Query | str, world: World = default_world, kg=None
+) -> pd.Series | None:
+    """First result of a SPARQL query (see `sparql`), None if there is none;
+    the query is only evaluated until a first result is found"""
+    for i_row, row in _iter_rows(query, world, kg):
+        return _chunk_frame([(i_row, row)], vars_from_query(str(query))).iloc[0]
+    return None
+
+
+class SparqlPool:
+    """Evaluate SPARQL queries in parallel, in worker processes each querying
+    a read-only copy of a world's quadstore (SQLite database file)
+
+    NOTE the copy is a snapshot of the world when the pool is created (pending changes are committed first)
+
+    Examples
+    --------
+    >>> with SparqlPool(world, n_jobs=4) as pool:
+    ...     results = pool.map(queries, kg)
+    """
+
+    def __init__(
+        self,
+        world: World = default_world,
+        n_jobs: int = None,
+        tmp_dir: str | Path = None,
+    ) -> None:
+        self.world = world
+        self.n_jobs = n_jobs or os.cpu_count()
+        self._tmp_dir = tempfile.TemporaryDirectory(prefix="wonka_", dir=tmp_dir)
+        self.filename = str(Path(self._tmp_dir.name) / "quadstore.sqlite3")
+        ### copy the quadstore (SQLite online backup, consistent only once committed)
+        world.graph.commit()
+        copy_db = sqlite3.connect(self.filename)
+        try:
+            world.graph.db.backup(copy_db)
+        finally:
+            copy_db.close()
+        self._executor = ProcessPoolExecutor(
+            self.n_jobs, initializer=_init_sparql_worker, initargs=(self.filename,)
+        )
+
+    def map(self, queries: Iterable[Query | str], kg=None) -> list[pd.DataFrame]:
+        """Evaluate queries in parallel (see `sparql`), results being returned in order
+
+        Parameters
+        ----------
+        queries : Iterable[Query | str]
+            queries to run
+        kg : KnowledgeGraph | QueryGraph, optional
+            restrict to a specific knowledge graph (see `sparql`), by default None
+
+        Returns
+        -------
+        list[pd.DataFrame]
+            results of each query
+        """
+        results = list(self._executor.map(_sparql_worker, map(str, queries)))
         if kg is not None:
-            kg_instances = set(map(str, kg.nodes())) | getattr(kg, "_trimmed", set())
-            _in_kg = lambda instance: str(instance) in kg_instances | {"nan"}
-            rows_to_del = []
-            for i_row, row in df_query_results.iterrows():
-                if np.any([not _in_kg(instance) for instance in row]):
-                    rows_to_del.append(i_row)
-            df_query_results = df_query_results.drop(rows_to_del)
-        return df_query_results
-    return pd.DataFrame(columns=query_vars)
+            kg_instances = _kg_instances(kg)
+            results = [
+                df[_in_kg(df, kg_instances)] if len(df) else df for df in results
+            ]
+        return results
+
+    def partition(
+        self,
+        queries: Iterable[Query | str],
+        subkgs: Mapping[Hashable, Any],
+        count: bool = False,
+    ) -> list[dict[Hashable, pd.DataFrame | int]]:
+        """Evaluate queries in parallel and partition their results among knowledge subgraphs
+        (see `sparql_partition`), results being returned in order"""
+        return [
+            _partition(df_query_results, subkgs, count)
+            for df_query_results in self._executor.map(
+                _sparql_worker, map(str, queries)
+            )
+        ]
+
+    def close(self):
+        self._executor.shutdown()
+        self._tmp_dir.cleanup()
+
+    def __enter__(self) -> SparqlPool:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# world of a worker process (see `SparqlPool`)
+_worker_world: World = None
+
+
+def _init_sparql_worker(filename: str):
+    global _worker_world
+    _worker_world = World(filename=filename, exclusive=False, read_only=True)
+
+
+def _sparql_worker(query: str) -> pd.DataFrame:
+    return sparql(query, _worker_world)
+
+
+# results of recent queries {(id(world), revision, query, variables): results}, least recently used last
+_results_cache: OrderedDict[tuple, pd.DataFrame] = OrderedDict()
+RESULTS_CACHE_SIZE = 128
+# worlds whose results are evicted once they are garbage collected {id(world)}
+_tracked_worlds: set[int] = set()
+
+
+def clear_results_cache():
+    """Forget cached query results (see `sparql`)"""
+    _results_cache.clear()
+
+
+def world_revision(world: World) -> int:
+    """Revision of a world: number of changes made to its quadstore (increases whenever the world changes)"""
+    return world.graph.db.total_changes
+
+
+def _results_key(query: Query | str, world: World) -> tuple:
+    """Cache key of query results: the world (its id, not to keep it alive), its revision
+    (number of changes made to its quadstore), the query's normalized text and the variables results are named after"""
+    query = str(query)
+    if id(world) not in _tracked_worlds:
+        _tracked_worlds.add(id(world))
+        weakref.finalize(world, _forget_world, id(world))
+    return (
+        id(world),
+        world_revision(world),
+        normalize_query(query),
+        tuple(vars_from_query(query)),
+    )
+
+
+def _forget_world(world_id: int):
+    """Evict the cached results of a garbage collected world (whose id may then be reused)"""
+    _tracked_worlds.discard(world_id)
+    for key in [key for key in _results_cache if key[0] == world_id]:
+        del _results_cache[key]
+
+
+def _cached_results(key: tuple) -> pd.DataFrame | None:
+    """Cached query results, None if absent (NOTE results are shared, they must not be modified)"""
+    df_query_results = _results_cache.get(key)
+    if df_query_results is not None:
+        _results_cache.move_to_end(key)
+    return df_query_results
+
+
+def _cache_results(key: tuple, df_query_results: pd.DataFrame):
+    _results_cache[key] = df_query_results
+    while len(_results_cache) > max(RESULTS_CACHE_SIZE, 0):
+        _results_cache.popitem(last=False)
+
+
+def _iter_rows(
+    query: Query | str, world: World = default_world, kg=None
+) -> Iterator[tuple[int, tuple[str, ...]]]:
+    """Formatted rows of query results with their position `(i_row, row)` (see `sparql`),
+    restricted to a knowledge graph if `kg` is given"""
+    query_vars = vars_from_query(str(query))
+    kg_instances = _kg_instances(kg) if kg is not None else None
+    formatted, filler = {}, None
+    for i_row, row in enumerate(world.sparql(str(query))):
+        if filler is None:
+            # add missing values as the variable's name
+            filler = tuple(query_vars[len(row) :])
+        values = []
+        for value in row:
+            key = (type(value), value)
+            if (name := formatted.get(key)) is None:
+                name = formatted[key] = format_iri(value)
+            values.append(name)
+        values = (*values, *filler)
+        if kg_instances is None or all(v in kg_instances for v in values):
+            yield i_row, values
+
+
+def _chunk_frame(
+    chunk: list[tuple[int, tuple[str, ...]]], query_vars: list[str]
+) -> pd.DataFrame:
+    df_chunk = _results_frame((row for _, row in chunk), query_vars)
+    df_chunk.index = [i_row for i_row, _ in chunk]
+    return df_chunk
+
+
+def _shared_attr(graphs: Iterable, name: str) -> Any:
+    """Attribute shared (same object) by all graphs, None otherwise"""
+    attrs = [getattr(graph, name, None) for graph in graphs]
+    if attrs and attrs[0] is not None and all(a is attrs[0] for a in attrs):
+        return attrs[0]
+    return None
+
+
+def _subgraph_labels(
+    df_query_results: pd.DataFrame,
+    component: dict[str, Hashable],
+    trimmed: set[str],
+    index: dict[Hashable, int],
+) -> np.ndarray:
+    """Subgraph (position in `index`) of each row, -1 if the row belongs to every subgraph
+    (only border nodes or missing values), -2 if it belongs to none of them"""
+    labels = np.full(len(df_query_results), -1)
+    outside = np.zeros(len(df_query_results), dtype=bool)
+    for var in df_query_results.columns:
+        column = df_query_results[var].astype("category")
+        category_labels = np.array(
+            [
+                -1
+                if value in trimmed or value == "nan"
+                else index.get(component.get(value), -2)
+                for value in map(str, column.cat.categories)
+            ]
+            + [-1]  # (code -1: missing value)
+        )
+        column_labels = category_labels[column.cat.codes.to_numpy()]
+        # values outside of the subgraphs, or of another subgraph than previous values
+        outside |= (column_labels == -2) | (
+            (column_labels >= 0) & (labels >= 0) & (column_labels != labels)
+        )
+        labels = np.where(column_labels >= 0, column_labels, labels)
+    labels[outside] = -2
+    return labels
+
+
+def _kg_instances(kg) -> frozenset[str]:
+    """Instances of a knowledge (or query) graph, incl. trimmed instances (see `KnowledgeGraph.divide`)
+    and "nan" (missing values), cached until the knowledge graph changes"""
+    version = getattr(kg, "_version", None)
+    cached = kg.__dict__.get("_kg_instances_cache")
+    if version is not None and cached is not None and cached[0] == version:
+        return cached[1]
+    kg_instances = frozenset(
+        {*map(str, kg.nodes()), *getattr(kg, "_trimmed", set()), "nan"}
+    )
+    if version is not None:
+        kg.__dict__["_kg_instances_cache"] = (version, kg_instances)
+    return kg_instances
+
+
+def _in_kg(df_query_results: pd.DataFrame, kg_instances: frozenset) -> np.ndarray:
+    """Mask of rows whose values all belong to `kg_instances`
+    (checked once per category of categorical columns)"""
+    mask = np.ones(len(df_query_results), dtype=bool)
+    for var in df_query_results.columns:
+        column = df_query_results[var]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            allowed = np.array(
+                [str(value) in kg_instances for value in column.cat.categories]
+                + ["nan" in kg_instances]  # (code -1: missing value)
+            )
+            mask &= allowed[column.cat.codes.to_numpy()]
+        else:
+            mask &= column.astype(str).isin(kg_instances).to_numpy()
+    return mask
+
+
+def _results_frame(rows: Iterable[Sequence], query_vars: list[str]) -> pd.DataFrame:
+    """Build a DataFrame of query results in one go, streaming rows into column buffers:
+    each column is categorical (individuals are heavily repeated), values being formatted (`format_iri`)
+    once per distinct value. Missing (trailing) columns are filled with the variable's name.
+    """
+    columns, n_rows = None, 0
+    for row in rows:
+        if columns is None:
+            columns = [array.array("i") for _ in row]
+            # codes of formatted values, codes of raw values (avoid formatting them again)
+            codes = [({}, {}) for _ in row]
+        for value, column, (str_codes, raw_codes) in zip(row, columns, codes):
+            key = (type(value), value)
+            code = raw_codes.get(key)
+            if code is None:
+                code = str_codes.setdefault(format_iri(value), len(str_codes))
+                raw_codes[key] = code
+            column.append(code)
+        n_rows += 1
+    if columns is None:
+        return pd.DataFrame(columns=query_vars)
+    frame = {}
+    for i, (column, (str_codes, _)) in enumerate(zip(columns, codes)):
+        var = query_vars[i] if i < len(query_vars) else f"x{i}"
+        frame[var] = pd.Categorical.from_codes(
+            np.frombuffer(column, dtype=np.int32), categories=list(str_codes)
+        )
+    for var in query_vars[len(columns) :]:
+        frame[var] = pd.Categorical.from_codes(
+            np.zeros(n_rows, dtype=np.int32), categories=[var]
+        )
+    return pd.DataFrame(frame)
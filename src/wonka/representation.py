@@ -7,88 +7,692 @@ from __future__ import annotations
 
 
 ### Local
+from wonka import __version__
 from wonka.utils import *
-from wonka.query import Query
+from wonka.query import Query, parse_query
 
 
-class KnowledgeGraph(nx.MultiDiGraph):
+class _ClassQueries:
+    """Queries on instances by class, based on a class index `{class: {node, ...}}` (`class_index`)
+    and on the ontology's class hierarchy (`graph["subclasses"]`, recorded when loading an ontology)
+    """
+
+    @staticmethod
+    def _class_hierarchy(onto: Ontology) -> dict[str, list[str]]:
+        """direct subclasses of each class of the ontology (including owl.Thing)"""
+        return {
+            str(cls): [str(subcls) for subcls in cls.subclasses()]
+            for cls in [Thing] + list(onto.classes())
+        }
+
+    def descendant_classes(self, cls: str) -> set[str]:
+        """`cls` and all its subclasses (transitively)"""
+        if "subclasses" not in self.graph:
+            raise ValueError("Unknown class hierarchy (not loaded from an ontology)")
+        subclasses, descendants, stack = self.graph["subclasses"], {cls}, [cls]
+        while stack:
+            for subcls in subclasses.get(stack.pop(), []):
+                if subcls not in descendants:
+                    descendants.add(subcls)
+                    stack.append(subcls)
+        return descendants
+
+    def instances_of(
+        self, classes: str | Iterable[str], descendants: bool = False
+    ) -> set[str]:
+        """Nodes whose class is (one of) `classes`, or any of their descendant classes if `descendants`"""
+        classes = [classes] if isinstance(classes, str) else classes
+        if descendants:
+            classes = set().union(*(self.descendant_classes(c) for c in classes))
+        class_index = self.class_index
+        return set().union(*(class_index.get(c, ()) for c in classes))
+
+    def class_counts(self) -> dict[str, int]:
+        """Number of instances per class (sorted by class)"""
+        return {cls: len(nodes) for cls, nodes in sorted(self.class_index.items())}
+
+
+class KnowledgeGraph(nx.MultiDiGraph, _ClassQueries):
+    _cache_format = 2  # increment whenever the content of cached graphs changes
+
     def __init__(
         self,
         load: str | Ontology = None,
         *args,
+        engine: str = "owlready2",
+        cache_dir: str | Path = None,
         **kwargs,
     ) -> None:
+        self._class_index = {}
+        self._version = 0
         super().__init__(*args, **{**{"directed": True}, **kwargs})
         if load is not None:
-            self.load(load)
+            self.load(load, engine=engine, cache_dir=cache_dir)
+
+    ###
+    ###     Class index {class: {node, ...}}, kept up to date as nodes are added/removed
+    ###
+
+    @property
+    def class_index(self) -> dict[str, set]:
+        """Instances of each class `{class: {node, ...}}` (read-only)"""
+        if not hasattr(self, "_graph"):
+            return self._class_index
+        ### graph views (e.g. subgraphs): built from the view's nodes, cached until the graph changes
+        cached = getattr(self, "_class_index_cache", None)
+        if cached is None or cached[0] != self._version:
+            class_index = {}
+            for node, cls in self.nodes(data="class"):
+                if cls is not None:
+                    class_index.setdefault(cls, set()).add(node)
+            cached = self._class_index_cache = (self._version, class_index)
+        return cached[1]
+
+    @property
+    def _version(self) -> int:
+        """structure version (incremented whenever nodes or edges are added or removed)"""
+        graph = self
+        while hasattr(graph, "_graph"):
+            graph = graph._graph
+        return graph.__dict__.get("_structure_version", 0)
+
+    @_version.setter
+    def _version(self, version: int):
+        self.__dict__["_structure_version"] = version
+
+    def _index(self, node: Hashable):
+        cls = self._node[node].get("class")
+        if cls is not None:
+            self._class_index.setdefault(cls, set()).add(node)
+
+    def _unindex(self, node: Hashable):
+        if node in self._node:
+            cls = self._node[node].get("class")
+            if cls in self._class_index:
+                self._class_index[cls].discard(node)
+                if not self._class_index[cls]:
+                    del self._class_index[cls]
+
+    def add_node(self, node_for_adding, **attr):
+        self._unindex(node_for_adding)
+        super().add_node(node_for_adding, **attr)
+        self._index(node_for_adding)
+        self._version += 1
+
+    def add_nodes_from(self, nodes_for_adding, **attr):
+        nodes_for_adding, nodes = list(nodes_for_adding), []
+        for n in nodes_for_adding:
+            try:
+                n not in self._node
+                nodes.append(n)
+            except TypeError:  # (node, data)
+                nodes.append(n[0])
+        for n in nodes:
+            self._unindex(n)
+        super().add_nodes_from(nodes_for_adding, **attr)
+        for n in nodes:
+            self._index(n)
+        self._version += 1
+
+    def remove_node(self, n):
+        self._unindex(n)
+        super().remove_node(n)
+        self._version += 1
+
+    def remove_nodes_from(self, nodes):
+        nodes = list(nodes)
+        for n in nodes:
+            self._unindex(n)
+        super().remove_nodes_from(nodes)
+        self._version += 1
+
+    def add_edge(self, u_for_edge, v_for_edge, key=None, **attr):
+        new_nodes = [n for n in (u_for_edge, v_for_edge) if n not in self._node]
+        key = super().add_edge(u_for_edge, v_for_edge, key, **attr)
+        for n in new_nodes:
+            self._index(n)
+        self._version += 1
+        return key
 
-    def load(self, load_from: str | Ontology) -> KnowledgeGraph:
+    def remove_edge(self, u, v, key=None):
+        super().remove_edge(u, v, key)
+        self._version += 1
+
+    def clear(self):
+        super().clear()
+        self._class_index = {}
+        self._version += 1
+
+    def clear_edges(self):
+        super().clear_edges()
+        self._version += 1
+
+    def load(
+        self,
+        load_from: str | Path | Ontology,
+        engine: str = "owlready2",
+        cache_dir: str | Path = None,
+    ) -> KnowledgeGraph:
         """Load knowledge either from an OWL file (.owl) or an Ontology (owlready2)
 
         Parameters
         ----------
-        load_from : str | Ontology
+        load_from : str | Path | Ontology
             OWL file path (.owl) or ontology (`Ontology`) to load knowledge from
+        engine : str, optional
+            ingestion engine, by default "owlready2"
+            "owlready2": traverse individuals and their properties through owlready2's python objects;
+            "quadstore": read triples in bulk from owlready2's SQLite quadstore (much faster on large ontologies).
+        cache_dir : str | Path, optional
+            directory where the graph built from an OWL file is cached, by default None (no caching).
+            As long as the file's content, the content of the (local) files of the ontologies it imports
+            and wonka's version are unchanged, the graph is reloaded from the cache without parsing the OWL file
+            (NOTE changes of ontologies imported from the web are not detected). Ignored when loading from an `Ontology`.
 
         Returns
         -------
         KnowledgeGraph
             self
         """
-        if isinstance(load_from, str) and load_from.endswith(".owl"):
-            onto = default_world.get_ontology(load_from).load()
+        path_to_cache = None
+        if isinstance(load_from, str | Path) and str(load_from).endswith(".owl"):
+            if cache_dir is not None:
+                if len(self):
+                    log.warning("Cache ignored: knowledge graph is not empty")
+                else:
+                    path_to_cache = self._cache_path(load_from, cache_dir, engine)
+                    if path_to_cache.exists() and self._load_from_cache(path_to_cache):
+                        return self
+            onto = default_world.get_ontology(str(load_from)).load()
         elif isinstance(load_from, Ontology):
             onto = load_from
         else:
             log.warning(f"Could not import\n{load_from}")
-        self._load_from_ontology(onto)
+        if engine == "owlready2":
+            self._load_from_ontology(onto)
+        elif engine == "quadstore":
+            self._load_from_quadstore(onto)
+        else:
+            raise ValueError(f"Unknown ingestion engine: {engine}")
+        self.graph["subclasses"] = self._class_hierarchy(onto)
+        if path_to_cache is not None:
+            self._save_to_cache(path_to_cache, onto)
+        return self
+
+    @staticmethod
+    def _cache_path(
+        path_to_owl: str | Path, cache_dir: str | Path, engine: str
+    ) -> Path:
+        """Cache file for an OWL file `{stem}_{tag}_{digest}.kg`: tagged with a hash of the file's path and the engine
+        (see `_save_to_cache`), named after a hash of its content, wonka's version,
+        the engine and the content format of the cache"""
+        tag = hashlib.sha256(f"{Path(path_to_owl).resolve()}|{engine}".encode())
+        digest = hashlib.sha256(
+            f"{__version__}|{engine}|{KnowledgeGraph._cache_format}|".encode()
+        )
+        digest.update(KnowledgeGraph._file_digest(path_to_owl).encode())
+        return Path(cache_dir) / (
+            f"{Path(path_to_owl).stem}_{tag.hexdigest()[:8]}_{digest.hexdigest()[:32]}.kg"
+        )
+
+    @staticmethod
+    def _file_digest(path: str | Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _imported_files(onto: Ontology) -> dict[str, str]:
+        """Local files of the ontologies (indirectly) imported by an ontology, with a hash of their content
+        `{path: digest}` (ontologies imported from the web are ignored)"""
+        imported_files = {}
+        for imported in onto.indirectly_imported_ontologies():
+            try:
+                path = owlready2.namespace._get_onto_file(
+                    imported.base_iri, imported.name, "r", only_local=True
+                )
+            except FileNotFoundError:
+                continue
+            imported_files[str(path)] = KnowledgeGraph._file_digest(path)
+        return imported_files
+
+    def _save_to_cache(self, path_to_cache: Path, onto: Ontology):
+        """Serialize nodes, classes, node data and keyed edges (classes, node types and keys interned as integers),
+        and the files of the ontologies `onto` imports (see `_imported_files`)"""
+        nodes = list(self.nodes())
+        index = {node: i for i, node in enumerate(nodes)}
+        node_data = [self.nodes[n] for n in nodes]
+        node_types, node_type_names = pd.factorize(
+            [data.get("nodeType") for data in node_data]
+        )
+        node_classes, class_names = pd.factorize(
+            [data.get("class") for data in node_data]
+        )
+        edges = list(self.edges(keys=True, data=True))
+        edge_keys, key_names = pd.factorize([k for _, _, k, _ in edges])
+        cached = {
+            "imports": self._imported_files(onto),
+            "graph": dict(self.graph),
+            "nodes": nodes,
+            "node_types": (node_types.astype(np.int32), node_type_names.tolist()),
+            "node_classes": (node_classes.astype(np.int32), class_names.tolist()),
+            "node_data": {
+                i: extra
+                for i, data in enumerate(node_data)
+                if (
+                    extra := {
+                        k: v for k, v in data.items() if k not in ("nodeType", "class")
+                    }
+                )
+            },
+            "edges": np.array(
+                [(index[s], index[o]) for s, o, _, _ in edges], dtype=np.int32
+            ).reshape(-1, 2),
+            "edge_keys": (edge_keys.astype(np.int32), key_names.tolist()),
+            "edge_data": {
+                i: data
+                for i, (_, _, _, data) in enumerate(edges)
+                if data != {"exists": True}
+            },
+        }
+        Path(path_to_cache).parent.mkdir(parents=True, exist_ok=True)
+        ### remove outdated caches of the same OWL file (and engine)
+        prefix = Path(path_to_cache).stem.rsplit("_", 1)[0]
+        for outdated in Path(path_to_cache).parent.glob(f"{prefix}_{'?' * 32}.kg"):
+            if outdated == Path(path_to_cache):
+                continue
+            outdated.unlink(missing_ok=True)
+        path_to_tmp = Path(f"{path_to_cache}.{os.getpid()}.tmp")
+        with open(path_to_tmp, "wb") as cache_file:
+            pickle.dump(cached, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path_to_tmp, path_to_cache)
+
+    def _load_from_cache(self, path_to_cache: Path) -> KnowledgeGraph | None:
+        """Load a cached graph (see `_save_to_cache`), None if the files of imported ontologies have changed"""
+        with open(path_to_cache, "rb") as cache_file:
+            cached = pickle.load(cache_file)
+        for path, digest in cached["imports"].items():
+            if not os.path.isfile(path) or self._file_digest(path) != digest:
+                log.info(f"Cache ignored: imported ontology {path} has changed")
+                return None
+        node_types, node_type_names = cached["node_types"]
+        node_classes, class_names = cached["node_classes"]
+        node_types, node_classes = node_types.tolist(), node_classes.tolist()
+        nodes = {}
+        for i, node in enumerate(cached["nodes"]):
+            data = nodes[node] = {}
+            if node_types[i] >= 0:
+                data["nodeType"] = node_type_names[node_types[i]]
+            if node_classes[i] >= 0:
+                data["class"] = class_names[node_classes[i]]
+            data.update(cached["node_data"].get(i, {}))
+        names, (edge_keys, key_names) = cached["nodes"], cached["edge_keys"]
+        edge_data = cached["edge_data"]
+        self.graph.update(cached["graph"])
+        self._add_from_bulk(
+            nodes,
+            {
+                (names[s], names[o], key_names[k]): edge_data.get(i)
+                for i, ((s, o), k) in enumerate(
+                    zip(cached["edges"].tolist(), edge_keys.tolist())
+                )
+            },
+        )
         return self
 
     def _load_from_ontology(
         self, onto: Ontology, exclude_relationships: Sequence = []
     ) -> KnowledgeGraph:
+        data_properties = set(onto.data_properties())
         for individual in onto.individuals():
-            name_indiv = format_iri(individual)
-            ### Add individual node
-            if not self.has_node(name_indiv):
+            self._add_individual(individual, data_properties, exclude_relationships)
+        return self
+
+    def _add_individual(
+        self,
+        individual: Thing,
+        data_properties: set,
+        exclude_relationships: Sequence = [],
+    ):
+        """Add an individual, its relations and data properties"""
+        name_indiv = format_iri(individual)
+        ### Add individual node
+        if not self.has_node(name_indiv):
+            self.add_node(
+                name_indiv,
+                **{"nodeType": "instance", "class": str(individual.__class__)},
+            )
+        for relation in individual.get_properties():
+            for neighbour in relation[individual]:
+                name_relation = format_iri(relation)
+                name_neighbour = format_iri(neighbour)
+                if relation in data_properties:
+                    ### Data property as an individual's attribute/node data (instead of creating a neighbour node)
+                    self.nodes[name_indiv][name_relation] = neighbour
+                else:
+                    if name_relation not in exclude_relationships:
+                        ### Add neighbour node
+                        if not self.has_node(name_neighbour):
+                            self.add_node(
+                                name_neighbour,
+                                **{
+                                    "nodeType": "instance",
+                                    "class": str(neighbour.__class__),
+                                },
+                            )
+                        ### Add edges between individual and neighbour nodes
+                        #   explicitly indicate relationship existence (altered in query graphs)
+                        #   (keyed lookup, O(1), instead of scanning the edge view)
+                        if not self.has_edge(
+                            name_indiv, name_neighbour, key=name_relation
+                        ):
+                            self.add_edge(
+                                name_indiv,
+                                name_neighbour,
+                                key=name_relation,
+                                **{"exists": True},
+                            )
+
+    def _load_from_quadstore(
+        self, onto: Ontology, exclude_relationships: Sequence = []
+    ) -> KnowledgeGraph:
+        """Bulk equivalent of `_load_from_ontology`, reading triples straight from the quadstore.
+        NOTE nodes are inserted individuals first, then neighbours (order differs from `_load_from_ontology`)
+        """
+        self._add_from_bulk(*self._read_quadstore(onto, exclude_relationships))
+        return self
+
+    @staticmethod
+    def _read_quadstore(
+        onto: Ontology, exclude_relationships: Sequence = []
+    ) -> tuple[dict[str, dict], dict[tuple, None]]:
+        """Read nodes (`{node: data}`) and keyed edges (`{(s, o, key): None}`) from the quadstore.
+        Properties, classes and namespaces are resolved once (per predicate, per combination
+        of types and per base IRI respectively) instead of once per individual.
+        """
+        world = onto.world
+        execute = world.graph.execute
+        data_properties = {prop.storid for prop in onto.data_properties()}
+
+        ### Named individuals declared in the ontology
+        individuals = dict.fromkeys(
+            s
+            for (s,) in execute(
+                "SELECT s FROM objs WHERE c=? AND p=? AND o=?",
+                (onto.graph.c, rdf_type, owl_named_individual),
+            )
+            if s > 0
+        )
+        types = {}
+        for s, o in execute(
+            "SELECT s, o FROM objs WHERE p=? AND o!=?", (rdf_type, owl_named_individual)
+        ):
+            if s in individuals:
+                types.setdefault(s, []).append(o)
+        ### Discard classes and properties (punning), as owlready2 does not return them as individuals
+        not_individual = {
+            owl_class,
+            owl_object_property,
+            owl_data_property,
+            owl_annotation_property,
+        }
+        for s in [s for s in individuals if not_individual & set(types.get(s, ()))]:
+            del individuals[s]
+
+        ### Resolve properties once: data property (node attribute) or relation (edge), inverse
+        props = {}
+
+        def _resolve(p: int):
+            if p not in props:
+                prop = world._get_by_storid(p)
+                if prop is None:  # rdf:type
+                    props[p] = None
+                else:
+                    inverse = getattr(prop, "_inverse_property", None) or None
+                    props[p] = (
+                        format_iri(prop),
+                        p in data_properties,
+                        inverse
+                        and (format_iri(inverse), inverse.storid in data_properties),
+                    )
+            return props[p]
+
+        ### Resolve names once per base IRI, classes once per combination of types
+        iris = dict(execute("SELECT storid, iri FROM resources"))
+        prefixes, classes = {}, {}
+
+        def _name(storid: int) -> str:
+            iri = iris[storid]
+            base, sep, local = iri.rpartition("#")
+            if not sep:
+                base, sep, local = iri.rpartition("/")
+            if base + sep not in prefixes:
+                prefixes[base + sep] = f"{world._get_by_storid(storid).namespace.name}."
+            return prefixes[base + sep] + local
+
+        def _class(storid: int) -> str:
+            key = tuple(sorted(types.get(storid, ())))
+            if key not in classes:
+                classes[key] = str(world._get_by_storid(storid).__class__)
+            return classes[key]
+
+        names = {s: _name(s) for s in individuals}
+        nodes = {
+            names[s]: {"nodeType": "instance", "class": _class(s)} for s in individuals
+        }
+        edges = {}
+
+        def _neighbour(value: Any, is_storid=True) -> str:
+            """name of a neighbour node (added to the graph if missing)"""
+            if is_storid and value in individuals:
+                return names[value]
+            neighbour = onto._to_python(value) if is_storid else value
+            name_neighbour = format_iri(neighbour)
+            if name_neighbour not in nodes:
+                nodes[name_neighbour] = {
+                    "nodeType": "instance",
+                    "class": str(neighbour.__class__),
+                }
+            return name_neighbour
+
+        ### Object triples (and their inverse)
+        for s, p, o in execute("SELECT s, p, o FROM objs WHERE p!=?", (rdf_type,)):
+            if (prop := _resolve(p)) is None:
+                continue
+            name_relation, is_data, inverse = prop
+            if s in individuals and not is_data:
+                if name_relation not in exclude_relationships:
+                    edges[(names[s], _neighbour(o), name_relation)] = None
+            if o in individuals and inverse and not inverse[1]:
+                if inverse[0] not in exclude_relationships:
+                    edges[(names[o], _neighbour(s), inverse[0])] = None
+
+        ### Data triples: node attributes (data properties) or literal neighbours
+        for s, p, o, d in execute("SELECT s, p, o, d FROM datas"):
+            if s not in individuals or (prop := _resolve(p)) is None:
+                continue
+            name_relation, is_data, _ = prop
+            value = onto._to_python(o, d)
+            if is_data:
+                nodes[names[s]][name_relation] = value
+            elif name_relation not in exclude_relationships:
+                edges[
+                    (names[s], _neighbour(value, is_storid=False), name_relation)
+                ] = None
+
+        return nodes, edges
+
+    def _add_from_bulk(self, nodes: dict[str, dict], edges: Mapping[tuple, dict]):
+        """Add nodes (`{node: data}`) and keyed edges (`{(s, o, key): data}`, data defaults to `{"exists": True}` if None)
+        writing networkx' adjacency structures directly (`add_edges_from` goes through views for each edge).
+        Edges must connect existing or listed nodes; existing edges are left untouched.
+        """
+        succ, pred, node_attr = self._succ, self._pred, self._node
+        adj_factory, node_factory = (
+            self.adjlist_inner_dict_factory,
+            self.node_attr_dict_factory,
+        )
+        key_factory, edge_factory = (
+            self.edge_key_dict_factory,
+            self.edge_attr_dict_factory,
+        )
+        for node, data in nodes.items():
+            if node not in node_attr:
+                succ[node], pred[node] = adj_factory(), adj_factory()
+                node_attr[node] = node_factory()
+            else:
+                self._unindex(node)
+            node_attr[node].update(data)
+            self._index(node)
+        for (s, o, k), data in edges.items():
+            keydict = succ[s].get(o)
+            if keydict is None:
+                # key dictionaries are shared by successors and predecessors
+                keydict = succ[s][o] = pred[o][s] = key_factory()
+            if k not in keydict:
+                keydict[k] = edge_factory()
+                keydict[k].update({"exists": True} if data is None else data)
+        self._version += 1
+
+    ###
+    ###     Incremental updates (after editing the ontology, instead of rebuilding the graph)
+    ###
+
+    def sync(
+        self,
+        onto: Ontology,
+        individuals: Iterable[Thing | str] = (),
+        triples: Iterable[tuple] = (),
+        exclude_relationships: Sequence = [],
+    ) -> set[str]:
+        """Patch the knowledge graph in place after the ontology was edited:
+        only the given individuals (and their neighbours, when needed) are re-read from the ontology.
+        If the graph was divided (`divide`), the subgraphs of the affected connected components are
+        updated as well (in the dict returned by the last `divide`, as long as it is referenced),
+        the others are left untouched.
+
+        Parameters
+        ----------
+        onto : Ontology
+            edited ontology (the one the knowledge graph was loaded from)
+        individuals : Iterable[Thing | str], optional
+            individuals added, modified or destroyed (owlready2 individuals or node names), by default ()
+        triples : Iterable[tuple], optional
+            triples `(subject, property, object)` added or removed (owlready2 entities/values or node names), by default ()
+        exclude_relationships : Sequence, optional
+            relationships ignored (see `load`), by default []
+
+        Returns
+        -------
+        set[str]
+            nodes that were updated (re-read, pruned or added)
+        """
+        ### individuals to re-read: relations (and inverse relations) are stored on both ends of an edge
+        entities, touched = {}, set()
+
+        def _resolve(entity: Thing | Any) -> str:
+            name = format_iri(entity)
+            if not isinstance(entity, Thing):
+                entity = self._find_individual(onto, name)
+            if entity is not None:
+                entities[name] = entity
+            if entity is not None or self.has_node(name):
+                touched.add(name)
+            return name
+
+        for _s, _, _o in triples:
+            _resolve(_s), _resolve(_o)
+        for individual in individuals:
+            name = _resolve(individual)
+            if self.has_node(name):
+                ### neighbours of added/removed individuals gained/lost (inverse) relations
+                touched.update(nx.all_neighbors(self, name))
+
+        data_properties = set(onto.data_properties())
+        updated = self._reread(
+            onto, touched, entities, data_properties, exclude_relationships
+        )
+        new_neighbours = {
+            n for name in touched if self.has_node(name) for n in self.successors(name)
+        }
+        updated |= self._reread(
+            onto,
+            new_neighbours - touched,
+            entities,
+            data_properties,
+            exclude_relationships,
+        )
+
+        ### prune nodes that are neither individuals nor neighbours of individuals anymore
+        for name in updated:
+            if self.has_node(name) and self.degree(name) == 0:
+                individual = entities.get(name) or self._find_individual(onto, name)
+                if individual is None or not self._is_individual(onto, individual):
+                    self.remove_node(name)
+        updated |= new_neighbours
+
+        self._update_division(updated)
+        return updated
+
+    def _reread(
+        self,
+        onto: Ontology,
+        names: set[str],
+        entities: dict[str, Thing],
+        data_properties: set,
+        exclude_relationships: Sequence = [],
+    ) -> set[str]:
+        """Drop relations and data properties of nodes `names`, then re-read them from `onto`
+        (returns re-read nodes and their former successors)
+        """
+        former_neighbours = set()
+        for name in names:
+            if self.has_node(name):
+                former_neighbours.update(self.successors(name))
+                self.remove_edges_from(list(self.out_edges(name, keys=True)))
+                data = self.nodes[name]
+                for attr in [
+                    attr for attr in data if attr not in ("nodeType", "class")
+                ]:
+                    del data[attr]
+        for name in names:
+            individual = entities.get(name) or self._find_individual(onto, name)
+            if individual is not None and self._is_individual(onto, individual):
                 self.add_node(
-                    name_indiv,
+                    name,
                     **{"nodeType": "instance", "class": str(individual.__class__)},
                 )
-            for relation in individual.get_properties():
-                for neighbour in relation[individual]:
-                    name_relation = format_iri(relation)
-                    name_neighbour = format_iri(neighbour)
-                    if relation in onto.data_properties():
-                        ### Data property as an individual's attribute/node data (instead of creating a neighbour node)
-                        self.nodes[name_indiv][name_relation] = neighbour
-                    else:
-                        if name_relation not in exclude_relationships:
-                            ### Add neighbour node
-                            if not self.has_node(name_neighbour):
-                                self.add_node(
-                                    name_neighbour,
-                                    **{
-                                        "nodeType": "instance",
-                                        "class": str(neighbour.__class__),
-                                    },
-                                )
-                            ### Add edges between individual and neighbour nodes
-                            #   explicitly indicate relationship existence (altered in query graphs)
-                            if not (
-                                name_indiv,
-                                name_neighbour,
-                                name_relation,
-                            ) in self.edges(keys=True):
-                                self.add_edge(
-                                    name_indiv,
-                                    name_neighbour,
-                                    key=name_relation,
-                                    **{"exists": True},
-                                )
+                self._add_individual(individual, data_properties, exclude_relationships)
+        return names | former_neighbours
+
+    @staticmethod
+    def _find_individual(onto: Ontology, name: str) -> Thing | None:
+        """Individual named `name` ("namespace.name", see `format_iri`), None if not found"""
+        prefix, _, local = name.partition(".")
+        world = onto.world
+        for namespace in list(world.ontologies.values()) + list(
+            world._namespaces.values()
+        ):
+            if namespace.name == prefix:
+                entity = world[namespace.base_iri + local]
+                if isinstance(entity, Thing):
+                    return entity
+        return None
+
+    @staticmethod
+    def _is_individual(onto: Ontology, entity: Thing) -> bool:
+        """Whether `entity` is (still) an individual of `onto` (i.e. listed in `onto.individuals()`)"""
+        return bool(
+            onto._has_obj_triple_spo(entity.storid, rdf_type, owl_named_individual)
+        )
 
     def divide(
-        self, border_cls: Sequence[str], key_cls: Sequence[str] = None
+        self,
+        border_cls: Sequence[str],
+        key_cls: Sequence[str] = None,
+        mode: str = "copy",
     ) -> dict[str | int, KnowledgeGraph]:
         """Divide knowledge graph in subgraphs,
         cutting off branches where classes in `border_cls` are found
@@ -99,32 +703,132 @@ class KnowledgeGraph(nx.MultiDiGraph):
             classes that make the interfaces between targeted subgraphs
         key_cls : Sequence[str], optional
             classes to use as primary key to identify the subgraphs, by default None
+        mode : str, optional
+            how subgraphs are returned, by default "copy"
+            "copy": subgraph views of a (deep) copy of the knowledge graph;
+            "view": lightweight subgraph views of the knowledge graph itself (no copy);
+            "frozen": materialized (shallow copies), frozen subgraphs.
 
         Returns
         -------
         dict[str | int, KnowledgeGraph]
             dict enumerating the knowledge subgraphs
         """
-        graph = copy.deepcopy(self)
-        subgraphs, trimmed = {}, set()
-        ### remove nodes at the border (interfaces between subgraphs)
-        for node in copy.deepcopy(graph.nodes()):
-            if graph.nodes[node]["class"] in border_cls:
-                graph.remove_node(node)
-                trimmed |= {node}
-
-        ### generate subgraphs from connected components (in the undirected sense)
-        for k, connected in enumerate(
-            nx.connected_components(graph.to_undirected(as_view=True))
-        ):
+        if mode not in ("copy", "view", "frozen"):
+            raise ValueError(f"Unknown mode: {mode}")
+        graph = copy.deepcopy(self) if mode == "copy" else self
+        ### mask nodes at the border (interfaces between subgraphs)
+        trimmed = graph.instances_of(border_cls)
+        key_nodes = graph.instances_of(key_cls) if key_cls is not None else set()
+
+        ### connected components (in the undirected sense), in a single union-find pass over edges
+        components = nx.utils.UnionFind()
+        for s, o in graph.edges():
+            if s not in trimmed and o not in trimmed:
+                components.union(s, o)
+        connected_components = {}
+        for node in graph:
+            if node not in trimmed:
+                connected_components.setdefault(components[node], []).append(node)
+
+        ### generate subgraphs from connected components
+        subgraphs, component = _Subgraphs(), {}
+        for k, connected in enumerate(connected_components.values()):
             if key_cls is not None:
-                key = [n for n in connected if graph.nodes[n]["class"] in key_cls].pop()
+                key = [n for n in connected if n in key_nodes].pop()
             else:
                 key = k
-            subgraphs[key] = graph.subgraph(connected)
-            subgraphs[key]._trimmed = trimmed
+            component.update(dict.fromkeys(connected, key))
+            subgraphs[key] = graph._component_subgraph(
+                connected, mode, trimmed, component
+            )
+
+        ### remember the division, to update affected subgraphs only (see `sync`)
+        #   subgraphs are weakly referenced: they (and the copy they are views of) are freed with the caller's result
+        self._division = {
+            "border_cls": border_cls,
+            "key_cls": key_cls,
+            "mode": mode,
+            "trimmed": trimmed,
+            "subgraphs": weakref.ref(subgraphs),
+            "component": component,
+            "next_key": len(subgraphs),
+        }
         return subgraphs
 
+    def _component_subgraph(
+        self, nodes: list, mode: str, trimmed: set, component: dict
+    ) -> KnowledgeGraph:
+        subgraph = self.subgraph(nodes)
+        if mode == "frozen":
+            subgraph = nx.freeze(subgraph.copy())
+        # (shared by all subgraphs) border nodes, and subgraph of each node {node: key}
+        subgraph._trimmed, subgraph._component = trimmed, component
+        return subgraph
+
+    def _update_division(self, updated: set):
+        """Recompute the connected components (from the last `divide`) containing updated nodes"""
+        division = self.__dict__.get("_division")
+        if division is None:
+            return
+        subgraphs = division["subgraphs"]()
+        if subgraphs is None:
+            # the subgraphs are not used anymore
+            del self._division
+            return
+        component = division["component"]
+        trimmed = division["trimmed"]
+        trimmed.clear()
+        trimmed.update(self.instances_of(division["border_cls"]))
+
+        ### affected components: those of updated nodes and of their neighbours
+        seeds = {n for n in updated if self.has_node(n)}
+        for node in list(seeds):
+            seeds.update(nx.all_neighbors(self, node))
+        affected = {component[n] for n in updated | seeds if n in component}
+        region = list(updated | seeds)
+        for key in affected:
+            region.extend(subgraphs.pop(key).nodes())
+        for node in region:
+            component.pop(node, None)
+
+        ### new components (in the undirected sense), explored from the affected region only
+        key_nodes = (
+            self.instances_of(division["key_cls"])
+            if division["key_cls"] is not None
+            else set()
+        )
+        # copies of the whole graph are avoided: new subgraphs of copies are materialized instead
+        mode = "view" if division["mode"] == "view" else "frozen"
+        seen = set()
+        for start in region:
+            if start in seen or start in trimmed or not self.has_node(start):
+                continue
+            seen.add(start)
+            connected, stack = [], [start]
+            while stack:
+                node = stack.pop()
+                connected.append(node)
+                for neighbour in nx.all_neighbors(self, node):
+                    if neighbour not in seen and neighbour not in trimmed:
+                        seen.add(neighbour)
+                        stack.append(neighbour)
+            if division["key_cls"] is not None:
+                key = [n for n in connected if n in key_nodes].pop()
+            else:
+                key = division["next_key"]
+                division["next_key"] += 1
+            component.update(dict.fromkeys(connected, key))
+            subgraphs[key] = self._component_subgraph(
+                connected, mode, trimmed, component
+            )
+
+    def __getstate__(self) -> dict:
+        # the last division (see `divide`) is not carried over to copies
+        state = self.__dict__.copy()
+        state.pop("_division", None)
+        return state
+
     def project_query_graph(
         self,
         uninstantiated_query_graph: QueryGraph,
@@ -140,7 +844,8 @@ class KnowledgeGraph(nx.MultiDiGraph):
         query_result : pd.DataFrame, optional
             DataFrame containing the results of a SPARQL query, by default pd.DataFrame()
         inplace : bool, optional
-            If False, return a copy, otherwise, do operation inplace and return self. by default False
+            If False, return an overlay of the knowledge graph (see `_overlay`, the knowledge graph is not copied),
+            otherwise, do operation inplace and return self. by default False
 
         Returns
         -------
@@ -152,38 +857,630 @@ class KnowledgeGraph(nx.MultiDiGraph):
             log.info("No query result...")
             return self
 
-        projKG = self if inplace else copy.deepcopy(self)
+        projection = self.project(uninstantiated_query_graph, query_result)
+        return projection.apply(self) if inplace else projection.render(self)
+
+    def project(
+        self, uninstantiated_query_graph: QueryGraph, query_result: pd.DataFrame
+    ) -> Projection:
+        """Edges of the knowledge graph matched by the results of a query (see `Projection`),
+        without altering (nor copying) the knowledge graph"""
+        return Projection.from_query(self, uninstantiated_query_graph, query_result)
+
+    def _overlay(self, edges: Iterable[tuple], **attr) -> KnowledgeGraph:
+        """Frozen overlay of the knowledge graph where `edges` (s, o, key) have additional attributes `attr`.
+        Only adjacency dicts are copied (shallow) and the attributes of `edges`:
+        other node/edge attributes are shared with the knowledge graph (not copied).
+        """
+        succ, pred = dict(self._succ), dict(self._pred)
+        copied = set()
+        for s, o, k in edges:
+            if ("succ", s) not in copied:
+                succ[s] = dict(succ[s])
+                copied.add(("succ", s))
+            if ("pred", o) not in copied:
+                pred[o] = dict(pred[o])
+                copied.add(("pred", o))
+            if (s, o) not in copied:
+                # key dictionaries are shared by successors and predecessors
+                succ[s][o] = pred[o][s] = dict(succ[s][o])
+                copied.add((s, o))
+            succ[s][o][k] = {**succ[s][o][k], **attr}
+        overlay = self.__class__()
+        overlay.graph = dict(self.graph)
+        overlay._node, overlay._adj, overlay._pred = self._node, succ, pred
+        overlay._class_index = self.class_index
+        overlay._version = self._version
+        if hasattr(self, "_trimmed"):
+            overlay._trimmed = self._trimmed
+        return nx.freeze(overlay)
+
+    def compact(self) -> CompactKnowledgeGraph:
+        """Memory-compact, read-only copy of the knowledge graph (see `CompactKnowledgeGraph`)"""
+        return CompactKnowledgeGraph.from_graph(self)
+
+
+class _Subgraphs(dict):
+    """Subgraphs returned by `KnowledgeGraph.divide` `{key: subgraph}` (a dict that can be weakly referenced)"""
+
 
-        for _, res in query_result.iterrows():
+@dataclass
+class Projection:
+    """Edges of a knowledge graph hit by the results of one or several queries,
+    with the number of hits (result rows) of each edge `{(s, o, p): hits}`.
+    Only the hit edges are stored: projections can be merged (`merge`, `+`), exported (`to_frame`)
+    and rendered onto the knowledge graph (`render`, `apply`).
+    """
 
-            instance = {var: str(indiv) for var, indiv in zip(res.index, res.values)}
+    hits: Counter = field(default_factory=Counter)
 
-            for _s, _o, _k in uninstantiated_query_graph.edges(keys=True):
-                s, o, p = (
-                    str(instance[_s]),
-                    str(instance[_o]),
-                    format_predicate(_k),
+    @classmethod
+    def from_query(
+        cls,
+        graph: KnowledgeGraph | CompactKnowledgeGraph,
+        uninstantiated_query_graph: QueryGraph,
+        query_result: pd.DataFrame,
+    ) -> Projection:
+        """Project the results of a query onto a knowledge graph,
+        edge by edge of the query graph (on unique pairs of result columns, with keyed lookups)
+
+        Parameters
+        ----------
+        graph : KnowledgeGraph | CompactKnowledgeGraph
+            Knowledge graph
+        uninstantiated_query_graph : QueryGraph
+            Uninstantiated query graph
+        query_result : pd.DataFrame
+            DataFrame containing the results of a SPARQL query
+
+        Returns
+        -------
+        Projection
+            edges of the knowledge graph hit by query results
+        """
+        columns = {}
+        hits = Counter()
+        for _s, _o, _k in uninstantiated_query_graph.edges(keys=True):
+            p = format_predicate(_k)
+            for var in (_s, _o):
+                if var not in columns:
+                    columns[var] = query_result[var].astype(str).to_numpy()
+            for (s, o), n in Counter(zip(columns[_s], columns[_o])).items():
+                if graph.has_edge(s, o, key=p):
+                    hits[(s, o, p)] += n
+        return cls(hits)
+
+    @property
+    def edges(self) -> set[tuple[str, str, str]]:
+        return set(self.hits)
+
+    def __len__(self) -> int:
+        return len(self.hits)
+
+    def __iter__(self):
+        return iter(self.hits)
+
+    def __contains__(self, edge: tuple) -> bool:
+        return edge in self.hits
+
+    def merge(self, *projections: Projection) -> Projection:
+        """Projection hitting the edges of all projections (hits are summed)"""
+        hits = Counter(self.hits)
+        for projection in projections:
+            hits.update(projection.hits)
+        return Projection(hits)
+
+    def __add__(self, other: Projection) -> Projection:
+        return self.merge(other)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Hit edges and their number of hits, most hit first"""
+        return pd.DataFrame(
+            [(s, p, o, n) for (s, o, p), n in self.hits.most_common()],
+            columns=["subject", "predicate", "object", "hits"],
+        )
+
+    def render(
+        self, graph: KnowledgeGraph | CompactKnowledgeGraph, **attr
+    ) -> KnowledgeGraph:
+        """Frozen overlay of the knowledge graph where hit edges are highlighted
+        (attributes `attr`, red by default); the knowledge graph itself is neither altered nor copied
+        """
+        if not isinstance(graph, KnowledgeGraph):
+            graph = graph.to_networkx()  # e.g. CompactKnowledgeGraph
+        edges = [edge for edge in self.hits if graph.has_edge(*edge)]
+        return graph._overlay(edges, **{"color": RED, "width": 5, **attr})
+
+    def apply(self, graph: KnowledgeGraph, **attr) -> KnowledgeGraph:
+        """Highlight hit edges in place (attributes `attr`, red by default)"""
+        for s, o, p in self.hits:
+            if graph.has_edge(s, o, key=p):
+                graph[s][o][p].update({"color": RED, "width": 5, **attr})
+        return graph
+
+
+class _StringPool:
+    """Immutable pool of sorted strings packed into a single UTF-8 buffer.
+    Strings are interned as their rank (integer id), looked up by binary search
+    (UTF-8 preserves code point order, so byte order matches `sorted`)."""
+
+    def __init__(self, strings: Iterable[str] = (), _sorted=False) -> None:
+        strings = list(strings) if _sorted else sorted(set(strings))
+        encoded = [s.encode() for s in strings]
+        self._offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=self._offsets[1:])
+        self._buffer = b"".join(encoded)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def _bytes(self, i: int) -> bytes:
+        return self._buffer[int(self._offsets[i]) : int(self._offsets[i + 1])]
+
+    def __getitem__(self, i: int) -> str:
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        return self._bytes(i % len(self)).decode()
+
+    def __iter__(self):
+        buffer, offsets = self._buffer, self._offsets.tolist()
+        for start, stop in zip(offsets[:-1], offsets[1:]):
+            yield buffer[start:stop].decode()
+
+    def index(self, string: str) -> int:
+        """id of `string`, -1 if it is not in the pool"""
+        target, lo, hi = str(string).encode(), 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._bytes(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < len(self) and self._bytes(lo) == target else -1
+
+    def take(self, ids: np.ndarray) -> _StringPool:
+        """sub-pool made of the strings `ids` (sorted)"""
+        offsets = self._offsets.tolist()
+        pool = _StringPool()
+        lengths = [offsets[i + 1] - offsets[i] for i in ids.tolist()]
+        pool._offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=pool._offsets[1:])
+        pool._buffer = b"".join(
+            self._buffer[offsets[i] : offsets[i + 1]] for i in ids.tolist()
+        )
+        return pool
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buffer) + self._offsets.nbytes
+
+
+class _CompactNodeView:
+    """networkx-like node view of a `CompactKnowledgeGraph` (`G.nodes`, `G.nodes(data=True)`, `G.nodes[n]`)"""
+
+    def __init__(self, graph: CompactKnowledgeGraph) -> None:
+        self._graph = graph
+
+    def __call__(self, data: bool | str = False, default=None):
+        if data is False:
+            return self
+        graph = self._graph
+        if data is True:
+            return ((n, graph._node_data(i)) for i, n in enumerate(graph._names))
+        return (
+            (n, graph._node_data(i).get(data, default))
+            for i, n in enumerate(graph._names)
+        )
+
+    def __getitem__(self, node: str) -> dict:
+        i = self._graph._names.index(node)
+        if i < 0:
+            raise KeyError(node)
+        return self._graph._node_data(i)
+
+    def __iter__(self):
+        return iter(self._graph._names)
+
+    def __len__(self) -> int:
+        return len(self._graph._names)
+
+    def __contains__(self, node: str) -> bool:
+        return self._graph._names.index(node) >= 0
+
+
+class CompactKnowledgeGraph(_ClassQueries):
+    """Read-only, memory-compact knowledge graph
+
+    Node names (IRIs) are interned in a sorted string pool, classes, node types and predicates
+    in small lookup tables, and (keyed) adjacency is stored as CSR arrays (NumPy) in both directions.
+    It exposes the subset of networkx' API used by wonka (`nodes`, `edges`, `G[u][v][key]`,
+    `has_node`, `has_edge`, `successors`, `predecessors`, `subgraph`...) as well as `divide`
+    and `project_query_graph`; `to_networkx` materializes the equivalent `KnowledgeGraph`.
+    NOTE nodes are sorted by name, edge data is limited to `{"exists": True}`
+    """
+
+    def __init__(
+        self, load: str | Path | Ontology = None, exclude_relationships: Sequence = []
+    ) -> None:
+        self.graph = {"directed": True}
+        self._build({}, {})
+        if load is not None:
+            self.load(load, exclude_relationships)
+
+    def load(
+        self, load_from: str | Path | Ontology, exclude_relationships: Sequence = []
+    ) -> CompactKnowledgeGraph:
+        """Load knowledge either from an OWL file (.owl) or an Ontology (owlready2),
+        reading triples in bulk from owlready2's quadstore (see `KnowledgeGraph._read_quadstore`)
+        """
+        if isinstance(load_from, str | Path) and str(load_from).endswith(".owl"):
+            onto = default_world.get_ontology(str(load_from)).load()
+        elif isinstance(load_from, Ontology):
+            onto = load_from
+        else:
+            log.warning(f"Could not import\n{load_from}")
+        self._build(*KnowledgeGraph._read_quadstore(onto, exclude_relationships))
+        self.graph["subclasses"] = self._class_hierarchy(onto)
+        return self
+
+    @classmethod
+    def from_graph(cls, graph: nx.MultiDiGraph) -> CompactKnowledgeGraph:
+        """Compact copy of a (knowledge) graph; edge data is dropped"""
+        compact = cls()
+        compact.graph.update(graph.graph)
+        compact._build(
+            dict(graph.nodes(data=True)), dict.fromkeys(graph.edges(keys=True))
+        )
+        if hasattr(graph, "_trimmed"):
+            compact._trimmed = graph._trimmed
+        return compact
+
+    def _build(self, nodes: dict[str, dict], edges: Iterable[tuple]):
+        """(Re)build the compact structures from `{node: data}` and keyed edges `(s, o, key)`"""
+        self._names = _StringPool(nodes)
+        index = {name: i for i, name in enumerate(self._names)}
+        node_data = [nodes[name] for name in self._names]
+        ### classes and node types (interned)
+        node_types, node_type_names = pd.factorize(
+            [data.get("nodeType") for data in node_data]
+        )
+        node_classes, class_names = pd.factorize(
+            [data.get("class") for data in node_data]
+        )
+        self._node_types, self._node_type_names = (
+            node_types.astype(np.int8),
+            node_type_names.tolist(),
+        )
+        self._node_classes, self._classes = (
+            node_classes.astype(np.int32),
+            class_names.tolist(),
+        )
+        ### other node data (e.g. data properties), one sparse column per attribute
+        columns = {}
+        for i, data in enumerate(node_data):
+            for attr, value in data.items():
+                if attr not in ("nodeType", "class"):
+                    columns.setdefault(attr, ([], []))
+                    columns[attr][0].append(i)
+                    columns[attr][1].append(value)
+        self._columns = {}
+        for attr, (ids, values) in columns.items():
+            dtypes = {type(v) for v in values}
+            dtype = dtypes.pop() if len(dtypes) == 1 else object
+            dtype = dtype if dtype in (bool, int, float) else object
+            self._columns[attr] = (
+                np.array(ids, dtype=np.int32),
+                np.array(values, dtype=dtype),
+            )
+        ### keyed edges as CSR arrays
+        edges = list(edges)
+        keys, key_names = pd.factorize([k for _, _, k in edges])
+        self._keys = key_names.tolist()
+        src = np.array([index[s] for s, _, _ in edges], dtype=np.int32)
+        dst = np.array([index[o] for _, o, _ in edges], dtype=np.int32)
+        self._set_edges(src, dst, keys.astype(np.int32))
+
+    def _set_edges(self, src: np.ndarray, dst: np.ndarray, keys: np.ndarray):
+        n = len(self._names)
+        out = np.lexsort((keys, dst, src))
+        self._out_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self._out_ptr[1:])
+        self._out_dst, self._out_key = dst[out], keys[out]
+        inc = np.lexsort((keys, src, dst))
+        self._in_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(dst, minlength=n), out=self._in_ptr[1:])
+        self._in_src, self._in_key = src[inc], keys[inc]
+
+    ###
+    ###     networkx-like API
+    ###
+
+    @property
+    def nodes(self) -> _CompactNodeView:
+        return _CompactNodeView(self)
+
+    @property
+    def class_index(self) -> dict[str, set]:
+        """Instances of each class `{class: {node, ...}}`"""
+        order = np.argsort(self._node_classes, kind="stable")
+        codes = self._node_classes[order]
+        bounds = np.flatnonzero(np.diff(codes)) + 1
+        return {
+            self._classes[ids[0]]: {self._names[i] for i in group.tolist()}
+            for ids, group in zip(np.split(codes, bounds), np.split(order, bounds))
+            if len(ids) and ids[0] >= 0
+        }
+
+    def class_counts(self) -> dict[str, int]:
+        """Number of instances per class (sorted by class), classes without instances excluded
+        (subgraphs share the class table of the graph they were induced from, see `_induced`)"""
+        counts = np.bincount(
+            self._node_classes[self._node_classes >= 0], minlength=len(self._classes)
+        )
+        return dict(sorted((c, n) for c, n in zip(self._classes, counts.tolist()) if n))
+
+    def _node_data(self, i: int) -> dict:
+        data = {}
+        if self._node_types[i] >= 0:
+            data["nodeType"] = self._node_type_names[self._node_types[i]]
+        if self._node_classes[i] >= 0:
+            data["class"] = self._classes[self._node_classes[i]]
+        for attr, (ids, values) in self._columns.items():
+            j = np.searchsorted(ids, i)
+            if j < len(ids) and ids[j] == i:
+                data[attr] = values[j].item() if values.dtype != object else values[j]
+        return data
+
+    def _id(self, node: str) -> int:
+        i = self._names.index(node)
+        if i < 0:
+            raise KeyError(node)
+        return i
+
+    def edges(self, keys=False, data=False, default=None):
+        names, key_names = self._names, self._keys
+        out_ptr = self._out_ptr.tolist()
+        out_dst, out_key = self._out_dst.tolist(), self._out_key.tolist()
+        for i, s in enumerate(names):
+            for j in range(out_ptr[i], out_ptr[i + 1]):
+                edge = (s, names[out_dst[j]])
+                if keys:
+                    edge += (key_names[out_key[j]],)
+                if data is True:
+                    edge += ({"exists": True},)
+                elif data is not False:
+                    edge += ({"exists": True}.get(data, default),)
+                yield edge
+
+    def __getitem__(self, node: str) -> dict[str, dict[str, dict]]:
+        """adjacency of `node`: {successor: {key: data}} (read-only copy)"""
+        i = self._id(node)
+        adjacency = {}
+        for j in range(self._out_ptr[i], self._out_ptr[i + 1]):
+            adjacency.setdefault(self._names[self._out_dst[j]], {})[
+                self._keys[self._out_key[j]]
+            ] = {"exists": True}
+        return adjacency
+
+    def successors(self, node: str):
+        i = self._id(node)
+        dst = self._out_dst[self._out_ptr[i] : self._out_ptr[i + 1]]
+        return (self._names[j] for j in dict.fromkeys(dst.tolist()))
+
+    neighbors = successors
+
+    def predecessors(self, node: str):
+        i = self._id(node)
+        src = self._in_src[self._in_ptr[i] : self._in_ptr[i + 1]]
+        return (self._names[j] for j in dict.fromkeys(src.tolist()))
+
+    def has_node(self, node: str) -> bool:
+        return self._names.index(node) >= 0
+
+    def has_edge(self, u: str, v: str, key: str = None) -> bool:
+        i, j = self._names.index(u), self._names.index(v)
+        if i < 0 or j < 0:
+            return False
+        start, stop = self._out_ptr[i], self._out_ptr[i + 1]
+        dst = self._out_dst[start:stop]
+        lo, hi = np.searchsorted(dst, j, "left"), np.searchsorted(dst, j, "right")
+        if key is None:
+            return lo < hi
+        return key in self._keys and (
+            self._keys.index(key) in self._out_key[start + lo : start + hi]
+        )
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, node: str) -> bool:
+        return self.has_node(node)
+
+    def number_of_nodes(self) -> int:
+        return len(self._names)
+
+    def number_of_edges(self) -> int:
+        return len(self._out_dst)
+
+    def is_directed(self) -> bool:
+        return True
+
+    def is_multigraph(self) -> bool:
+        return True
+
+    def __str__(self) -> str:
+        return f"{type(self).__name__} with {self.number_of_nodes()} nodes and {self.number_of_edges()} edges"
+
+    @property
+    def nbytes(self) -> int:
+        """Memory footprint of the compact structures (excluding the small lookup tables)"""
+        arrays = [
+            self._node_types,
+            self._node_classes,
+            self._out_ptr,
+            self._out_dst,
+            self._out_key,
+            self._in_ptr,
+            self._in_src,
+            self._in_key,
+        ] + [a for column in self._columns.values() for a in column]
+        return self._names.nbytes + sum(a.nbytes for a in arrays)
+
+    def subgraph(self, nodes: Iterable[str]) -> CompactKnowledgeGraph:
+        """Induced subgraph (compact copy)"""
+        ids = np.unique(
+            np.array(
+                [i for n in nodes if (i := self._names.index(n)) >= 0], dtype=np.int64
+            )
+        )
+        return self._induced(ids)
+
+    def _induced(self, ids: np.ndarray) -> CompactKnowledgeGraph:
+        """Induced subgraph on node ids `ids` (sorted)"""
+        n = len(self._names)
+        remap = np.full(n, -1, dtype=np.int64)
+        remap[ids] = np.arange(len(ids))
+        sub = CompactKnowledgeGraph()
+        sub.graph = dict(self.graph)
+        sub._names = self._names.take(ids)
+        sub._node_types, sub._node_type_names = (
+            self._node_types[ids],
+            self._node_type_names,
+        )
+        sub._node_classes, sub._classes = self._node_classes[ids], self._classes
+        sub._columns = {}
+        for attr, (col_ids, values) in self._columns.items():
+            keep = remap[col_ids] >= 0
+            if keep.any():
+                sub._columns[attr] = (
+                    remap[col_ids[keep]].astype(np.int32),
+                    values[keep],
                 )
+        src = np.repeat(np.arange(n), np.diff(self._out_ptr))
+        keep = (remap[src] >= 0) & (remap[self._out_dst] >= 0)
+        sub._keys = self._keys
+        sub._set_edges(
+            remap[src[keep]].astype(np.int32),
+            remap[self._out_dst[keep]].astype(np.int32),
+            self._out_key[keep],
+        )
+        return sub
+
+    def to_networkx(self) -> KnowledgeGraph:
+        """Materialize the equivalent (mutable) `KnowledgeGraph`"""
+        graph = KnowledgeGraph()
+        graph.graph.update(self.graph)
+        graph._add_from_bulk(
+            dict(self.nodes(data=True)), dict.fromkeys(self.edges(keys=True))
+        )
+        if hasattr(self, "_trimmed"):
+            graph._trimmed = self._trimmed
+        return graph
+
+    ###
+    ###     Knowledge graph operations
+    ###
 
-                if (s, o, p) in projKG.edges(keys=True):
-                    projKG[s][o][p]["color"] = RED
-                    projKG[s][o][p]["width"] = 5
-        return projKG
+    def divide(
+        self, border_cls: Sequence[str], key_cls: Sequence[str] = None
+    ) -> dict[str | int, CompactKnowledgeGraph]:
+        """Divide knowledge graph in subgraphs (see `KnowledgeGraph.divide`),
+        connected components are labelled with vectorized min-label propagation over the CSR arrays.
+        NOTE integer keys follow the (sorted) node order
+        """
+        n = len(self._names)
+        is_border = np.isin(
+            self._node_classes,
+            [i for i, c in enumerate(self._classes) if c in border_cls],
+        )
+        src = np.repeat(np.arange(n), np.diff(self._out_ptr))
+        dst = self._out_dst.astype(np.int64)
+        inner = ~is_border[src] & ~is_border[dst]
+        src, dst = src[inner], dst[inner]
+        ### min-label propagation with pointer jumping
+        labels = np.arange(n)
+        while True:
+            previous = labels.copy()
+            lowest = np.minimum(labels[src], labels[dst])
+            np.minimum.at(labels, src, lowest)
+            np.minimum.at(labels, dst, lowest)
+            labels = labels[labels]
+            if np.array_equal(labels, previous):
+                break
+        trimmed = {self._names[i] for i in np.flatnonzero(is_border).tolist()}
+        ### group nodes by component (components ordered by their lowest node id)
+        ids = np.flatnonzero(~is_border)
+        ids = ids[np.argsort(labels[ids], kind="stable")]
+        components = np.split(ids, np.flatnonzero(np.diff(labels[ids])) + 1)
+        key_ids = [i for i, c in enumerate(self._classes) if key_cls and c in key_cls]
+        subgraphs = {}
+        for k, component in enumerate(c for c in components if len(c)):
+            if key_cls is not None:
+                keys = component[np.isin(self._node_classes[component], key_ids)]
+                key = self._names[keys[-1].item()]
+            else:
+                key = k
+            subgraphs[key] = self._induced(component)
+            subgraphs[key]._trimmed = trimmed
+        return subgraphs
+
+    def project(
+        self, uninstantiated_query_graph: QueryGraph, query_result: pd.DataFrame
+    ) -> Projection:
+        """Edges hit by the results of a query, see `KnowledgeGraph.project`"""
+        return Projection.from_query(self, uninstantiated_query_graph, query_result)
+
+    def project_query_graph(
+        self,
+        uninstantiated_query_graph: QueryGraph,
+        query_result: pd.DataFrame = pd.DataFrame(),
+        inplace=False,
+    ) -> KnowledgeGraph:
+        """Project the results of a query onto the (materialized) knowledge graph,
+        see `KnowledgeGraph.project_query_graph`"""
+        if inplace:
+            raise nx.NetworkXError("CompactKnowledgeGraph is read-only")
+        graph = self.to_networkx()
+        if len(query_result) == 0:
+            log.info("No query result...")
+            return graph
+        return self.project(uninstantiated_query_graph, query_result).apply(graph)
 
 
 class QueryGraph(nx.MultiDiGraph):
+    _cache_format = 3  # increment whenever the content of cached graphs changes
+
     def __init__(
         self,
         load_from: str = None,
         *args,
+        cache_dir: str | Path = None,
         **kwargs,
     ):
         super().__init__(*args, **{**{"directed": True}, **kwargs})
         self._instantiated = False
         if load_from is not None:
-            self.load(load_from)
+            self.load(load_from, cache_dir=cache_dir)
+
+    def load(self, load_from: str | Path, cache_dir: str | Path = None) -> QueryGraph:
+        """Load a query either from a query file (.rq) or a `Query`
+
+        Parameters
+        ----------
+        load_from : str | Path
+            query file path (.rq) or query (`Query`)
+        cache_dir : str | Path, optional
+            directory where query graphs are cached on disk, by default None (in-memory cache only).
+            Query graphs are cached after the query's text (and wonka's version).
 
-    def load(self, load_from: str | Path) -> QueryGraph:
+        Returns
+        -------
+        QueryGraph
+            self
+        """
         if isinstance(load_from, str | Path) and str(load_from).endswith(".rq"):
             # query = "".join(open(str(load_from)))
             query = Query(load_from)
@@ -191,83 +1488,131 @@ class QueryGraph(nx.MultiDiGraph):
             query = load_from
         else:
             log.warning(f"Could not import\n{load_from}")
-        self._load_from_query(query)
+        nodes, edges = self._graph_data(str(query), cache_dir)
+        self.add_nodes_from(nodes)
+        self.add_edges_from(edges)
         return self
 
-    def _load_from_query(
-        self,
-        query: Query | str = None,
-        _Token: Any = None,
-        _meta: dict = {},
-    ) -> QueryGraph:
-        """Rudimentary parser to convert a SPARQL query into a QueryGraph
-        base on rdflib's `parseQuery`
+    @staticmethod
+    def _graph_data(query: str, cache_dir: str | Path = None) -> tuple[tuple, tuple]:
+        """Nodes and keyed edges (with data) of the query graph of `query`,
+        from the on-disk cache (if `cache_dir` is given) or the in-memory cache"""
+        if cache_dir is None:
+            return QueryGraph._parse(query)
+        digest = hashlib.sha256(
+            f"{__version__}|{QueryGraph._cache_format}|{query}".encode()
+        )
+        path_to_cache = Path(cache_dir) / f"query_{digest.hexdigest()[:32]}.qg"
+        if path_to_cache.exists():
+            with open(path_to_cache, "rb") as cache_file:
+                return pickle.load(cache_file)
+        graph_data = QueryGraph._parse(query)
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        path_to_tmp = Path(f"{path_to_cache}.{os.getpid()}.tmp")
+        with open(path_to_tmp, "wb") as cache_file:
+            pickle.dump(graph_data, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path_to_tmp, path_to_cache)
+        return graph_data
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _parse(query: str) -> tuple[tuple, tuple]:
+        """Nodes and keyed edges (with data) of the query graph of `query`, cached (LRU) on the query's text
+        NOTE cached data must not be modified (`add_nodes_from`/`add_edges_from` copy it)"""
+        graph = QueryGraph()._load_from_query(query)
+        return tuple(graph.nodes(data=True)), tuple(graph.edges(keys=True, data=True))
+
+    def _load_from_query(self, query: Query | str) -> QueryGraph:
+        """Convert a SPARQL query into a QueryGraph, walking its parse tree
+        (rdflib's `parseQuery`, see `parse_query`) iteratively, with an explicit stack.
+        Triples of each block are added once; those found in `FILTER NOT EXISTS`
+        patterns must not exist (`mustExist` is toggled at each nesting level, `FILTER EXISTS` keeps it);
+        OPTIONAL and UNION patterns are added as any other pattern.
 
         Parameters
         ----------
-        query : str, optional
-            SPARQL query, by default None
+        query : Query | str
+            SPARQL query
 
         Returns
         -------
         QueryGraph
             up-to-date query graph.
         """
-
-        if _Token is None:
-            ### Initialise
-            pq = parseQuery(str(query))
-            _Token = pq
-            _meta["mustExist"] = True
-
-        if isinstance(_Token, (ParseResults, list)):
-            ### Update from triples
-            for tok in _Token:
-                if getattr(tok, "name", None) == "TriplesBlock":
-                    self._update_from_triples(
-                        graph=self,
-                        triplesblock=tok,
-                        edge_data={"mustExist": _meta["mustExist"]},
-                    )
-                self._load_from_query(_Token=tok, _meta=_meta)
-
-        elif isinstance(_Token, CompValue):
-            ### Other kinds of tokens
-            if _Token.name == "Builtin_NOTEXISTS":
-                _meta["mustExist"] = not _meta["mustExist"]
-            for _, tok in _Token.items():
-                self._load_from_query(_Token=tok, _meta=_meta)
+        tree, prefixes = parse_query(str(query))
+        stack, visited = [(tree, True)], set()
+        while stack:
+            token, must_exist = stack.pop()
+            if isinstance(token, CompValue):
+                if (id(token), must_exist) in visited:
+                    continue
+                visited.add((id(token), must_exist))
+                if token.name == "TriplesBlock":
+                    self._update_from_triples(token["triples"], must_exist, prefixes)
+                    continue
+                if token.name == "Builtin_NOTEXISTS":
+                    must_exist = not must_exist
+                children = list(token.values())
+            elif isinstance(token, (list, ParseResults)):
+                children = list(token)
+            else:
+                continue
+            stack.extend((child, must_exist) for child in reversed(children))
         return self
 
     def _update_from_triples(
-        self, graph, triplesblock, edge_data: dict = {}, node_data: dict = {}
-    ):
-        def _get_node_attr(name: str, node_data: dict = {}):
-            node_attr = node_data
-            if name.startswith("?"):
-                node_attr["nodeType"] = "variable"
-            else:
-                node_attr["nodeType"] = "class"
-            return node_attr
-
-        def _get_edge_attr(sname: str, oname: str, edge_data: dict = {}):
-            if edge_data.get("mustExist") is None:
-                log.error("mustExist property was not set.")
-            edge_attr = edge_data
-            if not (sname.startswith("?") and oname.startswith("?")):
-                edge_attr["nodeType"] = "var2class"
+        self, triples: Iterable[Sequence], must_exist: bool, prefixes: dict[str, str]
+    ) -> QueryGraph:
+        for ts, tp, to in triples:
+            sname, pname, oname = (
+                self._term_name(ts, prefixes),
+                self._term_name(tp, prefixes),
+                self._term_name(to, prefixes),
+            )
+            for name in (sname, oname):
+                nodeType = "variable" if name.startswith("?") else "class"
+                self.add_node(name, **{"nodeType": nodeType})
+            if sname.startswith("?") and oname.startswith("?"):
+                nodeType = "var2var"
             else:
-                edge_attr["nodeType"] = "var2var"
-            return edge_attr
-
-        for ts, to, tp in triplesblock["triples"]:
-            sname, pname, oname = (token2name(ts), token2name(to), token2name(tp))
-            graph.add_node(sname, **_get_node_attr(sname, node_data))
-            graph.add_node(oname, **_get_node_attr(oname, node_data))
-            graph.add_edge(
-                sname, oname, key=pname, **_get_edge_attr(sname, oname, edge_data)
+                nodeType = "var2class"
+            self.add_edge(
+                sname,
+                oname,
+                key=pname,
+                **{"mustExist": must_exist, "nodeType": nodeType},
             )
-        return graph
+        return self
+
+    @staticmethod
+    def _term_name(term: Any, prefixes: dict[str, str]) -> str:
+        """Name of a query term: "?variable", "prefix:name" (with the prefixes declared in the query),
+        "<iri>" or "rdf:type"; property paths are named after their first property (e.g. first alternative)
+        """
+        while not isinstance(term, rdflib.term.Identifier):
+            if isinstance(term, CompValue):  # untranslated path
+                term = term["part"]
+            elif isinstance(term, list):
+                term = term[0]
+            elif hasattr(term, "args"):  # alternative, sequence, negated paths
+                term = term.args[0]
+            elif hasattr(term, "path"):  # e.g. `p*`
+                term = term.path
+            else:  # `^p`
+                term = term.arg
+        if isinstance(term, Variable):
+            return f"?{str(term)}"
+        elif isinstance(term, URIRef):
+            if term == RDF.type:
+                return "rdf:type"
+            namespaces = [ns for ns in prefixes if term.startswith(ns) and term != ns]
+            if namespaces:
+                namespace = max(namespaces, key=len)
+                return f"{prefixes[namespace]}:{term[len(namespace):]}"
+            return f"<{str(term)}>"
+        elif isinstance(term, BNode):
+            return f"_:{str(term)}"
+        return term.n3()
 
     def fold_class(self, inplace=False) -> QueryGraph:
         """Fold class nodes
@@ -329,10 +1674,15 @@ class QueryGraph(nx.MultiDiGraph):
         return graph
 
     def instantiate(
-        self, query_results: pd.DataFrame, KG: KnowledgeGraph = None, inplace=False
+        self,
+        query_results: pd.DataFrame | pd.Series,
+        KG: KnowledgeGraph = None,
+        inplace=False,
     ) -> QueryGraph:
         """instantiate query graph with individuals from query result.
-        if KG is provided, node and edge data will be imported from KG to the query graph"""
+        if KG is provided, node and edge data will be imported from KG to the query graph.
+        Only the first result is used: `query_results` may as well be a single result (e.g. from `sparql_first`)
+        """
 
         def swap_keys(nx_graph: nx.MultiDiGraph, mapping: dict):
             """swap keys {(node1, node2, old_key):new_key}"""
@@ -346,9 +1696,11 @@ class QueryGraph(nx.MultiDiGraph):
                 nx_graph.add_edge(s, o, key=k, **data)
             return nx_graph
 
-        if query_results.empty:
+        if query_results is None or query_results.empty:
             log.warning("No query result to instantiate the graph (empty DataFrame)")
             return self
+        if isinstance(query_results, pd.DataFrame):
+            query_results = query_results.iloc[0]
 
         ### Swap variables with individuals in qKG
         qKG_out = self if inplace else copy.deepcopy(self)
@@ -356,7 +1708,7 @@ class QueryGraph(nx.MultiDiGraph):
         for var_node, data in qKG_out.nodes(data=True):
             data["use"] = True
             if data["nodeType"] == "variable":
-                inst_node = str(query_results[var_node].iloc[0])
+                inst_node = str(query_results[var_node])
                 mapping[var_node] = inst_node
                 if KG is None:
                     data["nodeType"] = "instance"
@@ -0,0 +1,124 @@
+"""
+
+Requirement sets (couples of validating & non-validating queries)
+
+"""
+from __future__ import annotations
+
+### Local
+from wonka.utils import *
+from wonka.query import Query
+from wonka.representation import QueryGraph
+
+
+@dataclass
+class Requirement:
+    """A requirement, translated as a couple of queries (validating & non-validating)
+    and their (folded) query graphs"""
+
+    ID: str
+    query_ok: Query
+    query_nok: Query
+    query_graph_ok: QueryGraph
+    query_graph_nok: QueryGraph
+
+
+class RequirementSet:
+    """Requirements of a directory of queries `req_<ID>_ok.rq` & `req_<ID>_nok.rq`,
+    compiled (queries loaded, query graphs built and folded) in parallel"""
+
+    pattern = re.compile(r"req_(?P<ID>.+)_(?P<kind>ok|nok)\.rq")
+
+    def __init__(
+        self,
+        load_from: str | Path = None,
+        n_jobs: int = None,
+        cache_dir: str | Path = None,
+    ) -> None:
+        self.requirements: dict[str, Requirement] = {}
+        if load_from is not None:
+            self.load(load_from, n_jobs=n_jobs, cache_dir=cache_dir)
+
+    def load(
+        self,
+        path_to_queries: str | Path,
+        n_jobs: int = None,
+        cache_dir: str | Path = None,
+    ) -> RequirementSet:
+        """Find couples of queries `req_<ID>_ok.rq` & `req_<ID>_nok.rq` in a directory and compile them
+
+        Parameters
+        ----------
+        path_to_queries : str | Path
+            directory of queries (.rq)
+        n_jobs : int, optional
+            number of worker processes, by default None (as many as CPUs); 1 to compile in this process
+        cache_dir : str | Path, optional
+            directory where query graphs are cached (see `QueryGraph.load`), by default None
+
+        Returns
+        -------
+        RequirementSet
+            self
+        """
+        pairs = self._find_pairs(path_to_queries)
+        tasks = [(ID, *paths, cache_dir) for ID, paths in pairs.items()]
+        if n_jobs == 1 or len(tasks) <= 1:
+            compiled = [self._compile(*task) for task in tasks]
+        else:
+            n_workers = n_jobs or os.cpu_count()
+            with ProcessPoolExecutor(n_workers) as executor:
+                compiled = list(
+                    executor.map(
+                        self._compile,
+                        *zip(*tasks),
+                        chunksize=max(1, len(tasks) // (4 * n_workers)),
+                    )
+                )
+        self.requirements.update({req.ID: req for req in compiled})
+        return self
+
+    @classmethod
+    def _find_pairs(cls, path_to_queries: str | Path) -> dict[str, tuple[Path, Path]]:
+        """`{ID: (path_ok, path_nok)}`, sorted by ID (numerically if possible)"""
+        found = {}
+        for path in Path(path_to_queries).glob("req_*.rq"):
+            if match := cls.pattern.fullmatch(path.name):
+                found.setdefault(match["ID"], {})[match["kind"]] = path
+        pairs = {}
+        for ID in sorted(found, key=lambda ID: (not ID.isdigit(), len(ID), ID)):
+            if set(found[ID]) != {"ok", "nok"}:
+                log.warning(f"Incomplete requirement {ID}: {list(found[ID].values())}")
+                continue
+            pairs[ID] = (found[ID]["ok"], found[ID]["nok"])
+        return pairs
+
+    @staticmethod
+    def _compile(
+        ID: str, path_ok: Path, path_nok: Path, cache_dir: str | Path = None
+    ) -> Requirement:
+        query_ok, query_nok = Query(path_ok), Query(path_nok)
+        return Requirement(
+            ID,
+            query_ok,
+            query_nok,
+            QueryGraph(query_ok, cache_dir=cache_dir).fold_class(inplace=True),
+            QueryGraph(query_nok, cache_dir=cache_dir).fold_class(inplace=True),
+        )
+
+    @property
+    def queries(self) -> list[tuple[Query, Query]]:
+        """Couples of queries (validating & non-validating), e.g. for `ValidationMetric`"""
+        return [(req.query_ok, req.query_nok) for req in self.requirements.values()]
+
+    def __getitem__(self, ID: str) -> Requirement:
+        return self.requirements[ID]
+
+    def __iter__(self):
+        return iter(self.requirements.values())
+
+    def __len__(self) -> int:
+        return len(self.requirements)
+
+    def __repr__(self) -> str:
+        return f"RequirementSet({list(self.requirements)})"
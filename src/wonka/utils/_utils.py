@@ -12,7 +12,8 @@ from wonka.utils._graph_formatting import *
 
 ###
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from collections import Counter, OrderedDict
 
 import os, sys
 import shutil
@@ -22,7 +23,16 @@ import pprint
 import re
 import copy
 import time
-
+import functools
+import array
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import sqlite3
+import pickle
+import tempfile
+import weakref
+
+import owlready2
 from owlready2 import *
 import rdflib
 
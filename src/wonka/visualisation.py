@@ -10,7 +10,12 @@ def viz_nx_graph(
     relabel=True,
     save_as: Path | str = None,
 ):
+    if not isinstance(nx_graph, nx.Graph):
+        # e.g. CompactKnowledgeGraph
+        nx_graph = nx_graph.to_networkx()
     if relabel:
+        # label a copy: attributes may be shared with other graphs (e.g. projection overlays)
+        nx_graph = nx_graph.copy()
         for n, data in nx_graph.nodes(data=True):
             data["label"] = owl2_to_prefixed(str(n))
         for _, _, k, data in nx_graph.edges(keys=True, data=True):
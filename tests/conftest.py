@@ -0,0 +1,49 @@
+import pytest
+from owlready2 import DataProperty, ObjectProperty, Thing, World
+
+PREFIXES = "PREFIX test: <http://localhost/test#>\n"
+
+
+@pytest.fixture
+def onto():
+    """Small ontology: factories (key class) hosting machines and their sensors,
+    machines satisfying requirements (border class)"""
+    world = World()
+    onto = world.get_ontology("http://localhost/test#")
+    with onto:
+
+        class Factory(Thing):
+            pass
+
+        class Machine(Thing):
+            pass
+
+        class Robot(Machine):
+            pass
+
+        class Sensor(Thing):
+            pass
+
+        class Requirement(Thing):
+            pass
+
+        class hasMachine(ObjectProperty):
+            domain, range = [Factory], [Machine]
+
+        class hasSensor(ObjectProperty):
+            domain, range = [Machine], [Sensor]
+
+        class satisfies(ObjectProperty):
+            domain, range = [Machine], [Requirement]
+
+        class serial(DataProperty):
+            domain, range = [Machine], [str]
+
+    r1, r2 = Requirement("r1"), Requirement("r2")
+    m1, m2, m3, m4 = Machine("m1"), Robot("m2"), Machine("m3"), Robot("m4")
+    Factory("f1", hasMachine=[m1, m2])
+    Factory("f2", hasMachine=[m3])
+    Factory("f3", hasMachine=[m4])
+    m1.hasSensor, m1.satisfies, m1.serial = [Sensor("s1")], [r1], ["A|1"]
+    m3.hasSensor, m3.satisfies = [Sensor("s2"), Sensor("s3")], [r1, r2]
+    return onto
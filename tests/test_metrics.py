@@ -0,0 +1,27 @@
+from conftest import PREFIXES
+
+from wonka.metrics import ValidationMetric
+from wonka.representation import KnowledgeGraph
+
+QUERIES = [
+    (
+        PREFIXES + "SELECT ?m ?r WHERE { ?m test:satisfies ?r }",
+        PREFIXES + "SELECT ?f ?m WHERE { ?f test:hasMachine ?m . "
+        "FILTER NOT EXISTS { ?m test:satisfies [] } }",
+    )
+]
+
+
+def test_validation_of_compact_subgraphs(onto):
+    KG = KnowledgeGraph(onto)
+    division = {"border_cls": ["test.Requirement"], "key_cls": ["test.Factory"]}
+    subkgs = KG.divide(**division)
+    compact_subkgs = KG.compact().divide(**division)
+    metric = ValidationMetric(onto.world)
+    expected = metric.degrees_of_validation(QUERIES, subkgs)
+    assert expected["test.f1"] == {"valid_req": 0.0, "valid_rows": 0.5}
+    assert metric.degrees_of_validation(QUERIES, compact_subkgs) == expected
+    for key, subkg in compact_subkgs.items():
+        assert metric.degree_of_validation(QUERIES, subkg) == expected[key]
+    # read-only graphs are cached
+    assert all(subkg in metric._cache for subkg in compact_subkgs.values())
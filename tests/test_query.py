@@ -0,0 +1,112 @@
+import pytest
+from owlready2 import DataProperty, Thing, World, locstr
+
+from conftest import PREFIXES as TEST_PREFIXES
+
+from wonka.query import count_query, normalize_query, sparql, sparql_partition
+from wonka.representation import KnowledgeGraph
+
+PREFIXES = "PREFIX t: <http://localhost/test#>\n"
+
+
+def world() -> World:
+    world = World()
+    onto = world.get_ontology("http://localhost/test#")
+    with onto:
+
+        class A(Thing):
+            pass
+
+        class p(DataProperty):
+            pass
+
+        class q(DataProperty):
+            pass
+
+    for name, p_values, q_values in [
+        ("a", ["x|y"], ["z"]),
+        ("b", ["x"], ["y|z"]),
+        ("c", [1], ["1"]),
+        ("d", ["1"], ["1"]),
+        ("e", [locstr("hi", "en")], []),
+        ("f", [locstr("hi", "fr")], []),
+        ("g", ["hi"], []),
+    ]:
+        instance = A(name, namespace=onto)
+        instance.p, instance.q = p_values, q_values
+    return world
+
+
+def test_count_distinct():
+    w = world()
+    query = PREFIXES + (
+        "SELECT DISTINCT ?x ?y WHERE { ?s t:p ?x . OPTIONAL { ?s t:q ?y } }"
+    )
+    assert len(list(w.sparql(query))) == 7
+    assert list(w.sparql(count_query(query)))[0][0] == 7
+
+
+def test_normalize_query():
+    assert normalize_query(
+        "SELECT  ?x # it's a comment\n WHERE {\n ?x <http://a#b>  'x  # y' }  # c"
+    ) == ("SELECT ?x WHERE { ?x <http://a#b> 'x  # y' }")
+    # whitespaces and "#" within strings are kept
+    for query_a, query_b in [
+        ('SELECT ?x WHERE { ?x ?p "a\\"  b" }', 'SELECT ?x WHERE { ?x ?p "a\\" b" }'),
+        (
+            'SELECT ?x WHERE { ?x ?p """a\nb # c""" }',
+            'SELECT ?x WHERE { ?x ?p """a\nb # d""" }',
+        ),
+        (
+            "SELECT ?x WHERE { ?x ?p '''it's # c''' }",
+            "SELECT ?x WHERE { ?x ?p '''it's # d''' }",
+        ),
+    ]:
+        assert normalize_query(query_a) != normalize_query(query_b)
+    # strings that cannot be delimited: the query as is
+    query = 'SELECT ?x WHERE { ?x ?p "a  # b }'
+    assert normalize_query(query) == query
+
+
+def test_count_query_strings():
+    query = PREFIXES + (
+        'SELECT ?s WHERE { ?s t:p ?x . # comment\n FILTER(?x != "a\\" # b") }'
+    )
+    assert count_query(query) == PREFIXES + (
+        "SELECT (COUNT(*) AS ?count) WHERE { ?s t:p ?x . \n"
+        ' FILTER(?x != "a\\" # b") }'
+    )
+    assert list(world().sparql(count_query(query)))[0][0] == 7
+    with pytest.raises(ValueError):
+        count_query(PREFIXES + 'SELECT ?s WHERE { ?s t:p "a }')
+
+
+@pytest.mark.parametrize("key_cls", [["test.Factory"], None])
+def test_sparql_partition(onto, key_cls):
+    KG = KnowledgeGraph(onto)
+    subkgs = KG.divide(border_cls=["test.Requirement"], key_cls=key_cls)
+    (key_a, subkg_a), (key_b, subkg_b) = list(subkgs.items())[:2]
+    mappings = [
+        subkgs,
+        # keys other than the division's (renamed, subset, duplicated subgraphs)
+        {str(key): subkg for key, subkg in subkgs.items()},
+        {key_b: subkg_b},
+        {"a": subkg_a, "b": subkg_b, "c": subkg_a},
+        # not divided at once
+        {"a": KG.subgraph(subkg_a.nodes()), "b": KG.subgraph(subkg_b.nodes())},
+    ]
+    for query in [
+        "SELECT ?f ?m WHERE { ?f test:hasMachine ?m }",
+        "SELECT ?m ?r WHERE { ?m test:satisfies ?r }",
+        "SELECT ?m ?s WHERE { ?f test:hasMachine ?m . OPTIONAL { ?m test:hasSensor ?s } }",
+        "SELECT ?a ?b WHERE { ?a test:hasMachine ?m . ?b test:hasMachine ?n }",
+    ]:
+        query = TEST_PREFIXES + query
+        for mapping in mappings:
+            partition = sparql_partition(query, mapping, onto.world)
+            counts = sparql_partition(query, mapping, onto.world, count=True)
+            assert list(partition) == list(counts) == list(mapping)
+            for key, subkg in mapping.items():
+                expected = sparql(query, onto.world, subkg)
+                assert partition[key].equals(expected)
+                assert counts[key] == len(expected)
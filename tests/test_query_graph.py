@@ -0,0 +1,33 @@
+from wonka.representation import QueryGraph
+
+PREFIXES = "PREFIX w: <http://localhost/wonka#>\n"
+
+
+def edges(query: str) -> set[tuple]:
+    graph = QueryGraph()._load_from_query(PREFIXES + query)
+    return {
+        (s, o, k, data["mustExist"])
+        for s, o, k, data in graph.edges(keys=True, data=True)
+    }
+
+
+def test_nested_not_exists():
+    assert edges(
+        "SELECT * WHERE { ?a a w:A . "
+        "FILTER NOT EXISTS { ?a w:p ?d . FILTER NOT EXISTS { ?d w:nne ?e } } }"
+    ) == {
+        ("?a", "w:A", "rdf:type", True),
+        ("?a", "?d", "w:p", False),
+        ("?d", "?e", "w:nne", True),
+    }
+
+
+def test_exists_in_not_exists():
+    assert edges(
+        "SELECT * WHERE { ?a a w:A . "
+        "FILTER NOT EXISTS { ?b w:ne ?d . FILTER EXISTS { ?d w:e ?e } } }"
+    ) == {
+        ("?a", "w:A", "rdf:type", True),
+        ("?b", "?d", "w:ne", False),
+        ("?d", "?e", "w:e", False),
+    }
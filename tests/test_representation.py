@@ -0,0 +1,91 @@
+import pytest
+
+from wonka.metrics import HeterogeneousLinSimilarity
+from wonka.representation import CompactKnowledgeGraph, KnowledgeGraph
+
+DIVISION = {"border_cls": ["test.Requirement"], "key_cls": ["test.Factory"]}
+
+
+def test_compact_class_counts(onto):
+    KG = KnowledgeGraph(onto)
+    subkgs, compact_subkgs = KG.divide(**DIVISION), KG.compact().divide(**DIVISION)
+    assert KG.compact().class_counts() == KG.class_counts()
+    for key, subkg in subkgs.items():
+        assert compact_subkgs[key].class_counts() == subkg.class_counts()
+    sim = HeterogeneousLinSimilarity(onto)
+    assert sim.similarity_matrix(compact_subkgs).equals(sim.similarity_matrix(subkgs))
+
+
+@pytest.fixture(params=["compact", "load"])
+def graphs(onto, request):
+    """knowledge graph and its compact counterpart (compacted, or loaded from the ontology)"""
+    KG = KnowledgeGraph(onto)
+    if request.param == "compact":
+        return KG, KG.compact()
+    return KG, CompactKnowledgeGraph(onto)
+
+
+def test_compact_nodes_and_edges(graphs):
+    KG, compact = graphs
+    assert dict(compact.nodes(data=True)) == dict(KG.nodes(data=True))
+    assert dict(compact.nodes(data="class")) == dict(KG.nodes(data="class"))
+    assert compact.nodes["test.m1"] == KG.nodes["test.m1"]
+    assert len(compact) == len(KG) and "test.f1" in compact and "test.x" not in compact
+    assert sorted(compact.edges(keys=True)) == sorted(KG.edges(keys=True))
+    assert sorted(compact.edges(keys=True, data=True)) == sorted(
+        KG.edges(keys=True, data=True)
+    )
+    assert compact.number_of_edges() == KG.number_of_edges()
+    for s, o, k in [*KG.edges(keys=True), ("test.m1", "test.r1", "test.hasSensor")]:
+        assert compact.has_edge(s, o) == KG.has_edge(s, o)
+        assert compact.has_edge(s, o, k) == KG.has_edge(s, o, k)
+        assert compact.has_edge(o, s, k) == KG.has_edge(o, s, k)
+    assert not compact.has_edge("test.m1", "test.x")
+    for node in KG:
+        assert sorted(compact.successors(node)) == sorted(KG.successors(node))
+        assert sorted(compact.predecessors(node)) == sorted(KG.predecessors(node))
+        assert compact[node] == dict(KG[node])
+
+
+def test_compact_classes(graphs):
+    KG, compact = graphs
+    assert compact.class_counts() == KG.class_counts()
+    assert compact.class_index == KG.class_index
+    for cls in ["test.Machine", ["test.Machine", "test.Sensor"], "test.Unknown"]:
+        assert compact.instances_of(cls) == KG.instances_of(cls)
+        assert compact.instances_of(cls, descendants=True) == KG.instances_of(
+            cls, descendants=True
+        )
+
+
+def test_compact_divide(graphs):
+    KG, compact = graphs
+    subkgs, compact_subkgs = KG.divide(**DIVISION), compact.divide(**DIVISION)
+    assert {key: set(subkg) for key, subkg in compact_subkgs.items()} == {
+        key: set(subkg) for key, subkg in subkgs.items()
+    }
+    # (integer keys follow the node order, which differs between backends)
+    for division in [DIVISION, {"border_cls": ["test.Requirement"]}]:
+        subkgs, compact_subkgs = KG.divide(**division), compact.divide(**division)
+        assert sorted(map(sorted, compact_subkgs.values())) == sorted(
+            map(sorted, subkgs.values())
+        )
+        for subkg in compact_subkgs.values():
+            assert subkg._trimmed == {"test.r1", "test.r2"}
+            (expected,) = [s for s in subkgs.values() if set(s) == set(subkg)]
+            assert sorted(subkg.edges(keys=True)) == sorted(expected.edges(keys=True))
+            assert dict(subkg.nodes(data=True)) == dict(expected.nodes(data=True))
+            assert subkg.class_counts() == expected.class_counts()
+            assert subkg.class_index == expected.class_index
+
+
+def test_compact_to_networkx(graphs):
+    KG, compact = graphs
+    graph = compact.to_networkx()
+    assert isinstance(graph, KnowledgeGraph)
+    assert dict(graph.nodes(data=True)) == dict(KG.nodes(data=True))
+    assert sorted(graph.edges(keys=True, data=True)) == sorted(
+        KG.edges(keys=True, data=True)
+    )
+    assert graph.class_counts() == KG.class_counts()
+    assert graph.graph == KG.graph
@@ -0,0 +1,84 @@
+import gc
+import weakref
+
+import pytest
+from owlready2 import destroy_entity
+
+from wonka.representation import KnowledgeGraph
+
+DIVISION = {"border_cls": ["test.Requirement"], "key_cls": ["test.Factory"]}
+
+
+def assert_synced(KG, subkgs, onto, mode):
+    """the synced graph (and its last division) match a fresh load (and division)"""
+    fresh = KnowledgeGraph(onto)
+    assert dict(KG.nodes(data=True)) == dict(fresh.nodes(data=True))
+    assert sorted(KG.edges(keys=True, data=True)) == sorted(
+        fresh.edges(keys=True, data=True)
+    )
+    assert KG.class_index == fresh.class_index
+    fresh_subkgs = fresh.divide(**DIVISION, mode=mode)
+    # (components made of several key nodes are keyed after any of them)
+    assert sorted(map(sorted, subkgs.values())) == sorted(
+        map(sorted, fresh_subkgs.values())
+    )
+    for key, subkg in subkgs.items():
+        assert key in subkg
+        (expected,) = [s for s in fresh_subkgs.values() if set(s) == set(subkg)]
+        assert dict(subkg.nodes(data=True)) == dict(expected.nodes(data=True))
+        assert sorted(subkg.edges(keys=True)) == sorted(expected.edges(keys=True))
+        assert subkg._trimmed == expected._trimmed
+        assert {n: subkg._component[n] for n in subkg} == dict.fromkeys(subkg, key)
+
+
+@pytest.mark.parametrize("mode", ["copy", "view", "frozen"])
+def test_sync(onto, mode):
+    KG = KnowledgeGraph(onto)
+    subkgs = KG.divide(**DIVISION, mode=mode)
+    f3, m2, m3, s1 = onto.f3, onto.m2, onto.m3, onto.s1
+
+    ### add individuals
+    with onto:
+        m5 = onto.Machine("m5", hasSensor=[onto.Sensor("s4")], satisfies=[onto.r2])
+    f3.hasMachine.append(m5)
+    KG.sync(onto, individuals=[m5, onto.s4], triples=[(f3, onto.hasMachine, m5)])
+    assert_synced(KG, subkgs, onto, mode)
+    assert {"test.m5", "test.s4"} <= set(subkgs["test.f3"])
+
+    ### merge components (f1 and f2)
+    m3.hasSensor.append(s1)
+    KG.sync(onto, triples=[(m3, onto.hasSensor, s1)])
+    assert_synced(KG, subkgs, onto, mode)
+    assert len(subkgs) == 2
+
+    ### unmerge them
+    m3.hasSensor.remove(s1)
+    KG.sync(onto, triples=[(m3, onto.hasSensor, s1)])
+    assert_synced(KG, subkgs, onto, mode)
+    assert set(subkgs) == {"test.f1", "test.f2", "test.f3"}
+
+    ### destroy an individual (by name)
+    destroy_entity(m2)
+    KG.sync(onto, individuals=["test.m2"])
+    assert_synced(KG, subkgs, onto, mode)
+    assert "test.m2" not in KG and "test.m2" not in subkgs["test.f1"]
+
+    ### data properties
+    m3.serial = ["B"]
+    KG.sync(onto, individuals=[m3])
+    assert_synced(KG, subkgs, onto, mode)
+    assert subkgs["test.f2"].nodes["test.m3"]["test.serial"] == "B"
+
+
+def test_sync_released_division(onto):
+    KG = KnowledgeGraph(onto)
+    subkgs = KG.divide(**DIVISION)
+    copy = weakref.ref(subkgs["test.f1"]._graph)
+    del subkgs
+    gc.collect()
+    # the subgraphs and the copy they are views of are not kept alive by the graph
+    assert copy() is None
+    onto.m3.hasSensor.append(onto.s1)
+    KG.sync(onto, triples=[(onto.m3, onto.hasSensor, onto.s1)])
+    assert "_division" not in KG.__dict__
+    assert KG.has_edge("test.m3", "test.s1", "test.hasSensor")